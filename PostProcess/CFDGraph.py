@@ -21,6 +21,7 @@ import plotly.graph_objects as go  # or plotly.express as px
 # fig.update_layout( ... )
 
 import pandas as pd
+import numpy as np
 import dash_bootstrap_components as dbc
 from dash.dependencies import Input, Output, State
 from dash.exceptions import PreventUpdate
@@ -28,25 +29,35 @@ import sys
 
 
 def createGraph(cfd_distribution, showLog):
+    # 32 bit counts are serialized as compact arrays instead of Python lists
+    cfd_values = np.arange(101, dtype=np.int32)
+    ref_counts = np.asarray(cfd_distribution["ref"], dtype=np.int32)
+    var_counts = np.asarray(cfd_distribution["var"], dtype=np.int32)
+    # (ref, var) counts for each CFD value, read client side on hover
+    customdata = np.column_stack((ref_counts, var_counts))
     fig = go.Figure()  # or any Plotly Express function e.g. px.bar(...)
     fig.add_trace(
-        go.Scatter(
-            x=list(range(101)),
-            y=list(cfd_distribution["ref"]),
+        go.Scattergl(
+            x=cfd_values,
+            y=ref_counts,
             fill="tozeroy",
+            customdata=customdata,
             name="Tagets in Reference",  # fillcolor = 'yellow',
             # mode='none' # override default markers+lines
         )
     )
     fig.add_trace(
-        go.Scatter(
-            x=list(range(101)),
-            y=list(cfd_distribution["var"]),
+        go.Scattergl(
+            x=cfd_values,
+            y=var_counts,
             fill="tozeroy",
+            customdata=customdata,
             name="Targets in Enriched",
             # mode= 'none'
         )
     )
+    # keep zoom/pan state when the figure is updated, so Dash restyles instead of redrawing
+    fig.update_layout(uirevision="CFD-graph")
     if showLog:
         fig.update_layout(
             yaxis_type="log",
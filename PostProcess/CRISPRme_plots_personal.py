@@ -13,6 +13,7 @@ import numpy as np
 import math
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
+import matplotlib.collections as mcollections
 import matplotlib.lines as mlines
 import matplotlib.colors as mcolors
 
@@ -28,470 +29,275 @@ warnings.filterwarnings("ignore")
 matplotlib.use("Agg")
 
 
-def plot_with_MMvBUL(df, out_folder, guide):
-    # Remove targets ref with mm+bul<=1 for on-targets and on-targets variant-induced
-    df = df.loc[df["Mismatches+bulges_(fewest_mm+b)"] > 1]
+# separator of the AFs of haplotypes with multiple variants
+_AF_SEP = ","
 
-    # new col to store the scoring value for non-SpCas9 targets
-    df["Mismatches+bulges_REF_(fewest_mm+b)"] = 0
-    df["Mismatches+bulges_ALT_(fewest_mm+b)"] = 0
 
-    # if col is alt calculate score for ref and alt, if ref skip
-    for index in df.index:
-        if df.loc[index, "REF/ALT_origin_(fewest_mm+b)"] == "alt":
-            refTarget = str(df.loc[index, "Aligned_protospacer+PAM_REF_(fewest_mm+b)"])
-            countMM = 0
-            for nt in refTarget:
-                if nt.islower():
-                    countMM += 1
-            df.loc[index, "Mismatches+bulges_REF_(fewest_mm+b)"] = countMM + int(
-                df.loc[index, "Bulges_(fewest_mm+b)"]
-            )
-            df.loc[index, "Mismatches+bulges_ALT_(fewest_mm+b)"] = df.loc[
-                index, "Mismatches+bulges_(fewest_mm+b)"
-            ]
-        else:
-            df.loc[index, "Mismatches+bulges_REF_(fewest_mm+b)"] = df.loc[
-                index, "Mismatches+bulges_(fewest_mm+b)"
-            ]
-            df.loc[index, "Mismatches+bulges_ALT_(fewest_mm+b)"] = df.loc[
-                index, "Mismatches+bulges_(fewest_mm+b)"
-            ]
-
-    # sort in order to have highest REF mm+bul on top
-    df.sort_values("Mismatches+bulges_(fewest_mm+b)", ascending=True, inplace=True)
-    # top1000 targets
-    df = df.head(100)
-    # Make index column that numbers the OTs starting from 1
-    df.reset_index(inplace=True)
-    index_count = 1
-    for index in df.index:
-        df.loc[index, "index"] = index_count
-        index_count += 1
-    # If prim_AF = 'n', then it's a ref-nominated site, so we enter a fake numerical AF
-    # This will cause a warning of invalid sqrt later on, but that's fine to ignore
-    # df["prim_AF"] = df["prim_AF"].fillna(-1)
-    df["Variant_MAF_(fewest_mm+b)"] = df["Variant_MAF_(fewest_mm+b)"].fillna(-1)
-
-    # If multiple AFs (haplotype with multiple SNPs), take min AF
-    # Approximation until we have haplotype frequencies
-    df["AF"] = df["Variant_MAF_(fewest_mm+b)"].astype(str).str.split(",")
-    df["AF"] = df["AF"].apply(lambda x: min(x))
-    df["AF"] = pd.to_numeric(df["AF"])
-
-    # Adjustments for plotting purposes
-    # so haplotypes that got rounded down to AF = 0 (min AF = 0.01) still appear in the plot
-    df["plot_AF"] = df["AF"] + 0.001
-    df["plot_AF"] *= 1000  # make points larger
-    df["plot_AF"] = np.sqrt(df["plot_AF"])  # so size increase is linear
-
-    # Calculate ref_AF as (1 – alt_AF)
-    # Not precisely correct because there can be other non-ref haplotypes, but approximation should be accurate in most cases
-    df["ref_AF"] = 1 - df["AF"]
-    df["ref_AF"] *= 1000  # make points larger
-    df["ref_AF"] = np.sqrt(df["ref_AF"])  # so size increase is linear
-
-    # Transparent colors
-    transparent_red = mcolors.colorConverter.to_rgba("red", alpha=0.5)
-    transparent_blue = mcolors.colorConverter.to_rgba("blue", alpha=0.5)
-    transparent_gray = mcolors.colorConverter.to_rgba("gray", alpha=0.5)
-
-    # # Size legend
-    s1 = mlines.Line2D(
-        [],
-        [],
-        marker="o",
-        label="1",
-        linestyle="None",
-        markersize=math.sqrt(math.sqrt((1 + 0.001) * 1000)),
-        color="black",
-    )
-    s01 = mlines.Line2D(
-        [],
-        [],
-        marker="o",
-        label="0.1",
-        linestyle="None",
-        markersize=math.sqrt(math.sqrt((0.1 + 0.001) * 1000)),
-        color="black",
-    )
-    s001 = mlines.Line2D(
-        [],
-        [],
-        marker="o",
-        label="0.01",
-        linestyle="None",
-        markersize=math.sqrt(math.sqrt((0.01 + 0.001) * 1000)),
-        color="black",
+def _min_af(maf):
+    """Return the numeric minimum of comma-separated allele frequencies."""
+    return (
+        maf.astype(str)
+        .str.split(_AF_SEP, expand=True)
+        .apply(pd.to_numeric, errors="coerce")
+        .min(axis=1)
     )
 
-    """
-    Log, ref/alt, top 1000: for main text
-    """
-    # matplotlib plot settings
-    plt.rcParams["figure.dpi"] = 600
-    plt.rcParams["figure.figsize"] = 7.5, 2.25
-    plt.rcParams.update({"font.size": 7})
-    plt.rcParams["pdf.fonttype"] = 42
-    plt.rcParams["ps.fonttype"] = 42
-
-    # Plot data
-    ax = df.plot.scatter(
-        x="index",
-        y="Mismatches+bulges_REF_(fewest_mm+b)",
-        s="ref_AF",
-        c=transparent_red,
-        zorder=1,
-    )
-
-    # ax = df.plot.scatter(x="index", y="highest_CFD_score(ref)", s="ref_AF", c=transparent_red, zorder=1, ax=ax)
-    df.plot.scatter(
-        x="index",
-        y="Mismatches+bulges_ALT_(fewest_mm+b)",
-        s="plot_AF",
-        c=transparent_blue,
-        zorder=2,
-        ax=ax,
-    )
-
-    ax.set_xscale("log")
-    # plt.title("Top CRISPRme-identified sites for sgRNA 1617")
-    plt.xlabel("Candidate off-target site")
-    plt.ylabel("Mismatches+Bulges")
-
-    # Boundaries
-    plt.xlim(xmin=0.9, xmax=100)
-    # plt.ylim(ymin=0, ymax=1)
-
-    # Arrows
-    for x, y, z in zip(
-        df["index"],
-        df["Mismatches+bulges_REF_(fewest_mm+b)"],
-        df["Mismatches+bulges_ALT_(fewest_mm+b)"]
-        - df["Mismatches+bulges_REF_(fewest_mm+b)"],
-    ):
-        plt.arrow(
-            x,
-            y + 0.02,
-            0,
-            z - 0.04,
-            color="gray",
-            head_width=(x * (10**0.005 - 10 ** (-0.005))),
-            head_length=0.02,
-            length_includes_head=True,
-            zorder=0,
-            alpha=0.5,
-        )
-        # +/- to avoid overlap of arrow w/ points, head_width calculated to remain constant despite log scale of x-axis
-
-    # Size legend
-    plt.gca().add_artist(
-        plt.legend(handles=[s1, s01, s001], title="Allele frequency", ncol=3, loc=9)
-    )
-
-    # Color legend
-    red = mpatches.Patch(color=transparent_red, label="Reference")
-    blue = mpatches.Patch(color=transparent_blue, label="Alternative")
-    plt.legend(handles=[red, blue])
-
-    # Save
-    plt.tight_layout()
-    plt.savefig(out_folder + f"CRISPRme_fewest_top_1000_log_for_main_text_{guide}.png")
-    plt.clf()
-
-
-def plot_with_CRISTA_score(df, out_folder, guide):
-    # Remove targets with mm+bul<=1 since they are probably on-target introduced by variants
-    df = df.loc[df["Mismatches+bulges_(highest_CRISTA)"] > 1]
-    # sort values to have highest scored target on top
-    df.sort_values("CRISTA_score_(highest_CRISTA)", ascending=False, inplace=True)
-    # keep top1000 targets
-    df = df.head(100)
-    # Make index column that numbers the OTs starting from 1
-    df.reset_index(inplace=True)
-    index_count = 1
-    for index in df.index:
-        df.loc[index, "index"] = index_count
-        index_count += 1
 
+def _prep_af(maf):
+    """Return the AF and the ALT/REF marker sizes for a variant MAF column."""
     # If prim_AF = 'n', then it's a ref-nominated site, so we enter a fake numerical AF
     # This will cause a warning of invalid sqrt later on, but that's fine to ignore
-    df["Variant_MAF_(highest_CRISTA)"] = df["Variant_MAF_(highest_CRISTA)"].fillna(-1)
-
     # If multiple AFs (haplotype with multiple SNPs), take min AF
     # Approximation until we have haplotype frequencies
-    df["AF"] = df["Variant_MAF_(highest_CRISTA)"].astype(str).str.split(",")
-    df["AF"] = df["AF"].apply(lambda x: min(x))
-    df["AF"] = pd.to_numeric(df["AF"])
-
+    af = _min_af(maf.fillna(-1)).to_numpy(dtype=np.float32)
     # Adjustments for plotting purposes
     # so haplotypes that got rounded down to AF = 0 (min AF = 0.01) still appear in the plot
-    df["plot_AF"] = df["AF"] + 0.001
-    df["plot_AF"] *= 1000  # make points larger
-    df["plot_AF"] = np.sqrt(df["plot_AF"])  # so size increase is linear
-
+    # make points larger, sqrt so size increase is linear
+    plot_af = np.sqrt((af + 0.001) * 1000)
     # Calculate ref_AF as (1 – alt_AF)
     # Not precisely correct because there can be other non-ref haplotypes, but approximation should be accurate in most cases
-    df["ref_AF"] = 1 - df["AF"]
-    df["ref_AF"] *= 1000  # make points larger
-    df["ref_AF"] = np.sqrt(df["ref_AF"])  # so size increase is linear
-
-    # Transparent colors
-    transparent_red = mcolors.colorConverter.to_rgba("red", alpha=0.5)
-    transparent_blue = mcolors.colorConverter.to_rgba("blue", alpha=0.5)
-    transparent_gray = mcolors.colorConverter.to_rgba("gray", alpha=0.5)
-
-    # # Size legend
-    s1 = mlines.Line2D(
-        [],
-        [],
-        marker="o",
-        label="1",
-        linestyle="None",
-        markersize=math.sqrt(math.sqrt((1 + 0.001) * 1000)),
-        color="black",
-    )
-    s01 = mlines.Line2D(
+    ref_af = np.sqrt((1 - af) * 1000)
+    return af, plot_af, ref_af
+
+
+# columns read from the integrated results, all the others are skipped while parsing
+COLUMNS_DTYPES = {
+    "Mismatches+bulges_(fewest_mm+b)": np.float32,
+    "Mismatches+bulges_(highest_CRISTA)": np.float32,
+    "Mismatches+bulges_(highest_CFD)": np.float32,
+    "CRISTA_score_(highest_CRISTA)": np.float32,
+    "CFD_score_(highest_CFD)": np.float32,
+    "CRISTA_score_REF_(highest_CRISTA)": np.float32,
+    "CRISTA_score_ALT_(highest_CRISTA)": np.float32,
+    "CFD_score_REF_(highest_CFD)": np.float32,
+    "CFD_score_ALT_(highest_CFD)": np.float32,
+    "Variant_MAF_(fewest_mm+b)": str,
+    "Variant_MAF_(highest_CRISTA)": str,
+    "Variant_MAF_(highest_CFD)": str,
+    "Aligned_protospacer+PAM_REF_(fewest_mm+b)": str,
+    "Bulges_(fewest_mm+b)": np.float32,
+    "REF/ALT_origin_(fewest_mm+b)": str,
+}
+
+# matplotlib plot settings
+plt.rcParams["figure.dpi"] = 600
+plt.rcParams["figure.figsize"] = 7.5, 2.25
+plt.rcParams.update({"font.size": 7})
+plt.rcParams["pdf.fonttype"] = 42
+plt.rcParams["ps.fonttype"] = 42
+
+# Transparent colors
+_TRED = mcolors.colorConverter.to_rgba("red", alpha=0.5)
+_TBLUE = mcolors.colorConverter.to_rgba("blue", alpha=0.5)
+_TGRAY = mcolors.colorConverter.to_rgba("gray", alpha=0.5)
+
+# Size legend
+_MARK_SIZES = {af: math.sqrt(math.sqrt((af + 0.001) * 1000)) for af in (1, 0.1, 0.01)}
+_SIZE_LEGEND = [
+    mlines.Line2D(
         [],
         [],
         marker="o",
-        label="0.1",
+        label=str(af),
         linestyle="None",
-        markersize=math.sqrt(math.sqrt((0.1 + 0.001) * 1000)),
-        color="black",
-    )
-    s001 = mlines.Line2D(
-        [],
-        [],
-        marker="o",
-        label="0.01",
-        linestyle="None",
-        markersize=math.sqrt(math.sqrt((0.01 + 0.001) * 1000)),
+        markersize=markersize,
         color="black",
     )
+    for af, markersize in _MARK_SIZES.items()
+]
+
+# Color legend
+_COLOR_LEGEND = [
+    mpatches.Patch(color=_TRED, label="Reference"),
+    mpatches.Patch(color=_TBLUE, label="Alternative"),
+]
+
+
+def _plot_scored(
+    df,
+    out_folder,
+    guide,
+    *,
+    score_col,
+    ref_col,
+    alt_col,
+    mmb_col,
+    maf_col,
+    ylabel,
+    figname_tmpl,
+    ascending=False,
+    ylim=None,
+    prepare=None,
+):
+    # Remove targets with mm+bul<=1 since they are probably on-target introduced by variants
+    scores = df[score_col][df[mmb_col] > 1]
+    # keep top1000 targets, highest scored target on top (partial sort), only
+    # the selected rows of the shared dataframe are copied
+    if ascending:
+        df = df.loc[scores.nsmallest(100).index]
+    else:
+        df = df.loc[scores.nlargest(100).index]
+    # Make index column that numbers the OTs starting from 1
+    df.reset_index(drop=True, inplace=True)
+    if prepare is not None:
+        df = prepare(df)
+    df["index"] = np.arange(1, len(df) + 1, dtype=np.int32)
+    df["AF"], df["plot_AF"], df["ref_AF"] = _prep_af(df[maf_col])
+    # single precision is enough for the scatter offsets and sizes
+    for col in (ref_col, alt_col):
+        df[col] = df[col].astype(np.float32)
 
     """
     Log, ref/alt, top 1000: for main text
     """
-    # matplotlib plot settings
-    plt.rcParams["figure.dpi"] = 600
-    plt.rcParams["figure.figsize"] = 7.5, 2.25
-    plt.rcParams.update({"font.size": 7})
-    plt.rcParams["pdf.fonttype"] = 42
-    plt.rcParams["ps.fonttype"] = 42
-
-    # Plot data CFD SCORE
+    # Plot data
     ax = df.plot.scatter(
         x="index",
-        y="CRISTA_score_REF_(highest_CRISTA)",
+        y=ref_col,
         s="ref_AF",
-        c=transparent_red,
+        c=_TRED,
         zorder=1,
     )
-    # ax = df.plot.scatter(x="index", y="highest_CRISTA_score(ref)", s="ref_AF", c=transparent_red, zorder=1, ax=ax)
     df.plot.scatter(
         x="index",
-        y="CRISTA_score_ALT_(highest_CRISTA)",
+        y=alt_col,
         s="plot_AF",
-        c=transparent_blue,
+        c=_TBLUE,
         zorder=2,
         ax=ax,
     )
     ax.set_xscale("log")
 
     plt.xlabel("Candidate off-target site")
-    plt.ylabel("CRISTA score")
+    plt.ylabel(ylabel)
 
     # Boundaries
     plt.xlim(xmin=0.9, xmax=100)
-    plt.ylim(ymin=0, ymax=1)
-
-    # Arrows
-    for x, y, z in zip(
-        df["index"],
-        df["CRISTA_score_REF_(highest_CRISTA)"],
-        df["CRISTA_score_ALT_(highest_CRISTA)"]
-        - df["CRISTA_score_REF_(highest_CRISTA)"],
-    ):
-        plt.arrow(
-            x,
-            y + 0.02,
-            0,
-            z - 0.04,
-            color="gray",
-            head_width=(x * (10**0.005 - 10 ** (-0.005))),
-            head_length=0.02,
-            length_includes_head=True,
+    if ylim is not None:
+        plt.ylim(ymin=ylim[0], ymax=ylim[1])
+
+    # Arrows, drawn as a single collection of shafts plus one head marker per target
+    # +/- to avoid overlap of arrow w/ points, head markers keep a constant size despite log scale of x-axis
+    xs = df["index"].to_numpy(dtype=float)
+    ys = df[ref_col].to_numpy(dtype=float) + 0.02
+    dzs = df[alt_col].to_numpy(dtype=float) - df[ref_col].to_numpy(dtype=float) - 0.04
+    segments = np.stack(
+        [np.stack([xs, ys], axis=1), np.stack([xs, ys + dzs], axis=1)], axis=1
+    )
+    ax.add_collection(
+        mcollections.LineCollection(
+            segments, colors=[_TGRAY], linewidths=0.5, zorder=0
+        )
+    )
+    upward = dzs > 0
+    for marker, mask in (("^", upward), ("v", ~upward)):
+        ax.scatter(
+            xs[mask],
+            ys[mask] + dzs[mask],
+            marker=marker,
+            s=5,
+            c=[_TGRAY],
+            linewidths=0,
             zorder=0,
-            alpha=0.5,
         )
-        # +/- to avoid overlap of arrow w/ points, head_width calculated to remain constant despite log scale of x-axis
 
     # Size legend
     plt.gca().add_artist(
-        plt.legend(handles=[s1, s01, s001], title="Allele frequency", ncol=3, loc=9)
+        plt.legend(handles=_SIZE_LEGEND, title="Allele frequency", ncol=3, loc=9)
     )
 
     # Color legend
-    red = mpatches.Patch(color=transparent_red, label="Reference")
-    blue = mpatches.Patch(color=transparent_blue, label="Alternative")
-    plt.legend(handles=[red, blue])
+    plt.legend(handles=_COLOR_LEGEND)
 
     # Save
     plt.tight_layout()
-    plt.savefig(out_folder + f"CRISPRme_CRISTA_top_1000_log_for_main_text_{guide}.png")
+    plt.savefig(out_folder + figname_tmpl.format(guide=guide))
     plt.clf()
 
 
-def plot_with_CFD_score(df, out_folder, guide):
-    # Remove targets with mm+bul<=1 since they are probably on-target introduced by variants
-    df = df.loc[df["Mismatches+bulges_(highest_CFD)"] > 1]
-
-    # sort values to have highest scored target on top
-    df.sort_values("CFD_score_(highest_CFD)", ascending=False, inplace=True)
-    # keep top1000 targets
-    df = df.head(100)
-    # Make index column that numbers the OTs starting from 1
-    df.reset_index(inplace=True)
-    index_count = 1
-    for index in df.index:
-        df.loc[index, "index"] = index_count
-        index_count += 1
-
-    # If prim_AF = 'n', then it's a ref-nominated site, so we enter a fake numerical AF
-    # This will cause a warning of invalid sqrt later on, but that's fine to ignore
-    df["Variant_MAF_(highest_CFD)"] = df["Variant_MAF_(highest_CFD)"].fillna(-1)
-
-    # If multiple AFs (haplotype with multiple SNPs), take min AF
-    # Approximation until we have haplotype frequencies
-    df["AF"] = df["Variant_MAF_(highest_CFD)"].astype(str).str.split(",")
-    df["AF"] = df["AF"].apply(lambda x: min(x))
-    df["AF"] = pd.to_numeric(df["AF"])
-
-    # Adjustments for plotting purposes
-    # so haplotypes that got rounded down to AF = 0 (min AF = 0.01) still appear in the plot
-    df["plot_AF"] = df["AF"] + 0.001
-    df["plot_AF"] *= 1000  # make points larger
-    df["plot_AF"] = np.sqrt(df["plot_AF"])  # so size increase is linear
-
-    # Calculate ref_AF as (1 – alt_AF)
-    # Not precisely correct because there can be other non-ref haplotypes, but approximation should be accurate in most cases
-    df["ref_AF"] = 1 - df["AF"]
-    df["ref_AF"] *= 1000  # make points larger
-    df["ref_AF"] = np.sqrt(df["ref_AF"])  # so size increase is linear
-
-    # Transparent colors
-    transparent_red = mcolors.colorConverter.to_rgba("red", alpha=0.5)
-    transparent_blue = mcolors.colorConverter.to_rgba("blue", alpha=0.5)
-    transparent_gray = mcolors.colorConverter.to_rgba("gray", alpha=0.5)
-
-    """
-    # Linear, annotated, top 100 (for supplement)
-    # """
-
-    # # Size legend
-    s1 = mlines.Line2D(
-        [],
-        [],
-        marker="o",
-        label="1",
-        linestyle="None",
-        markersize=math.sqrt(math.sqrt((1 + 0.001) * 1000)),
-        color="black",
-    )
-    s01 = mlines.Line2D(
-        [],
-        [],
-        marker="o",
-        label="0.1",
-        linestyle="None",
-        markersize=math.sqrt(math.sqrt((0.1 + 0.001) * 1000)),
-        color="black",
+def _add_mmb_ref_alt(df):
+    # new col to store the scoring value for non-SpCas9 targets
+    # if col is alt calculate score for ref and alt, if ref skip
+    is_alt = (df["REF/ALT_origin_(fewest_mm+b)"] == "alt").to_numpy()
+    # mismatches in the REF target are reported as lowercase nucleotides,
+    # count them on the fixed-width byte matrix of the aligned targets
+    ref_targets = (
+        df["Aligned_protospacer+PAM_REF_(fewest_mm+b)"].fillna("").to_numpy(dtype="S")
     )
-    s001 = mlines.Line2D(
-        [],
-        [],
-        marker="o",
-        label="0.01",
-        linestyle="None",
-        markersize=math.sqrt(math.sqrt((0.01 + 0.001) * 1000)),
-        color="black",
+    codes = ref_targets.view(np.uint8).reshape(len(ref_targets), ref_targets.itemsize)
+    countMM = ((codes >= ord("a")) & (codes <= ord("z"))).sum(axis=1)
+    return df.assign(
+        **{
+            "Mismatches+bulges_REF_(fewest_mm+b)": np.where(
+                is_alt,
+                countMM + df["Bulges_(fewest_mm+b)"].to_numpy(),
+                df["Mismatches+bulges_(fewest_mm+b)"].to_numpy(),
+            ),
+            "Mismatches+bulges_ALT_(fewest_mm+b)": df[
+                "Mismatches+bulges_(fewest_mm+b)"
+            ],
+        }
     )
 
-    """
-    Log, ref/alt, top 1000: for main text
-    """
-    # matplotlib plot settings
-    plt.rcParams["figure.dpi"] = 600
-    plt.rcParams["figure.figsize"] = 7.5, 2.25
-    plt.rcParams.update({"font.size": 7})
-    plt.rcParams["pdf.fonttype"] = 42
-    plt.rcParams["ps.fonttype"] = 42
-
-    # Plot data CFD SCORE
-    ax = df.plot.scatter(
-        x="index",
-        y="CFD_score_REF_(highest_CFD)",
-        s="ref_AF",
-        c=transparent_red,
-        zorder=1,
-    )
-    # ax = df.plot.scatter(x="index", y="highest_CFD_score(ref)", s="ref_AF", c=transparent_red, zorder=1, ax=ax)
-    df.plot.scatter(
-        x="index",
-        y="CFD_score_ALT_(highest_CFD)",
-        s="plot_AF",
-        c=transparent_blue,
-        zorder=2,
-        ax=ax,
-    )
-    ax.set_xscale("log")
 
-    plt.xlabel("Candidate off-target site")
-    plt.ylabel("CFD score")
+def plot_with_MMvBUL(df, out_folder, guide):
+    _plot_scored(
+        df,
+        out_folder,
+        guide,
+        score_col="Mismatches+bulges_(fewest_mm+b)",
+        ref_col="Mismatches+bulges_REF_(fewest_mm+b)",
+        alt_col="Mismatches+bulges_ALT_(fewest_mm+b)",
+        mmb_col="Mismatches+bulges_(fewest_mm+b)",
+        maf_col="Variant_MAF_(fewest_mm+b)",
+        ylabel="Mismatches+Bulges",
+        figname_tmpl="CRISPRme_fewest_top_1000_log_for_main_text_{guide}.png",
+        ascending=True,
+        prepare=_add_mmb_ref_alt,
+    )
 
-    # Boundaries
-    plt.xlim(xmin=0.9, xmax=100)
-    plt.ylim(ymin=0, ymax=1)
-
-    # Arrows
-    for x, y, z in zip(
-        df["index"],
-        df["CFD_score_REF_(highest_CFD)"],
-        df["CFD_score_ALT_(highest_CFD)"] - df["CFD_score_REF_(highest_CFD)"],
-    ):
-        plt.arrow(
-            x,
-            y + 0.02,
-            0,
-            z - 0.04,
-            color="gray",
-            head_width=(x * (10**0.005 - 10 ** (-0.005))),
-            head_length=0.02,
-            length_includes_head=True,
-            zorder=0,
-            alpha=0.5,
-        )
-        # +/- to avoid overlap of arrow w/ points, head_width calculated to remain constant despite log scale of x-axis
 
-    # Size legend
-    plt.gca().add_artist(
-        plt.legend(handles=[s1, s01, s001], title="Allele frequency", ncol=3, loc=9)
+def plot_with_CRISTA_score(df, out_folder, guide):
+    _plot_scored(
+        df,
+        out_folder,
+        guide,
+        score_col="CRISTA_score_(highest_CRISTA)",
+        ref_col="CRISTA_score_REF_(highest_CRISTA)",
+        alt_col="CRISTA_score_ALT_(highest_CRISTA)",
+        mmb_col="Mismatches+bulges_(highest_CRISTA)",
+        maf_col="Variant_MAF_(highest_CRISTA)",
+        ylabel="CRISTA score",
+        figname_tmpl="CRISPRme_CRISTA_top_1000_log_for_main_text_{guide}.png",
+        ylim=(0, 1),
     )
 
-    # Color legend
-    red = mpatches.Patch(color=transparent_red, label="Reference")
-    blue = mpatches.Patch(color=transparent_blue, label="Alternative")
-    plt.legend(handles=[red, blue])
 
-    # Save
-    plt.tight_layout()
-    plt.savefig(out_folder + f"CRISPRme_CFD_top_1000_log_for_main_text_{guide}.png")
-    plt.clf()
+def plot_with_CFD_score(df, out_folder, guide):
+    _plot_scored(
+        df,
+        out_folder,
+        guide,
+        score_col="CFD_score_(highest_CFD)",
+        ref_col="CFD_score_REF_(highest_CFD)",
+        alt_col="CFD_score_ALT_(highest_CFD)",
+        mmb_col="Mismatches+bulges_(highest_CFD)",
+        maf_col="Variant_MAF_(highest_CFD)",
+        ylabel="CFD score",
+        figname_tmpl="CRISPRme_CFD_top_1000_log_for_main_text_{guide}.png",
+        ylim=(0, 1),
+    )
 
 
 # Read file
-df_guide = pd.read_csv(sys.argv[1], sep="\t", index_col=False, na_values=["n"])
+df_guide = pd.read_csv(
+    sys.argv[1],
+    sep="\t",
+    index_col=False,
+    na_values=["n"],
+    usecols=list(COLUMNS_DTYPES),
+    dtype=COLUMNS_DTYPES,
+)
 out_folder = sys.argv[2]
 guide = sys.argv[3]
 
@@ -1,7 +1,12 @@
 #!/usr/bin/env python
 
+import csv
 import sys
 
+import pandas as pd
+
+# number of targets processed at once
+CHUNK_SIZE = 500000
 
 file_in = sys.argv[1]
 file_out = sys.argv[2]
@@ -19,18 +24,25 @@ with open(file_in, "r") as fin:
         if alt:
             header.append("CLUSTER_ID")
         fout.write("\t".join(header) + "\n")
-        for line in fin:
-            splitted = line.strip().split("\t")
-            cfd_diff = float(splitted[20]) - float(splitted[21])
-            abs_diff = abs(cfd_diff)
-            # mmblg_cfd_diff = float(splitted[42]) - float(splitted[43])
-            # mmblg_abs_diff = abs(mmblg_cfd_diff)
-            fout.write(
-                "\t".join(splitted) + "\t" + str(cfd_diff) + "\t" + str(abs_diff) + "\n"
+        try:
+            chunks = pd.read_csv(
+                fin,
+                sep="\t",
+                header=None,
+                dtype=str,
+                keep_default_na=False,
+                quoting=csv.QUOTE_NONE,
+                chunksize=CHUNK_SIZE,
+            )
+        except pd.errors.EmptyDataError:  # header only (e.g. no variant targets)
+            chunks = []
+        for chunk in chunks:
+            # astype(float) parses with Python's float(), exact as the line by line
+            # version (pd.to_numeric may differ in the last digit)
+            cfd_diff = chunk[20].astype(float) - chunk[21].astype(float)
+            # mmblg_cfd_diff = chunk[42].astype(float) - chunk[43].astype(float)
+            chunk["Highest_CFD_Risk_Score"] = cfd_diff
+            chunk["Highest_CFD_Absolute_Risk_Score"] = cfd_diff.abs()
+            chunk.to_csv(
+                fout, sep="\t", header=False, index=False, quoting=csv.QUOTE_NONE
             )
-            # if alt:
-            #     fout.write('\t'.join(splitted[:22])+'\t'+"{:.3f}".format(cfd_diff)+'\t'+"{:.3f}".format(abs_diff)+"\t"+"\t".join(
-            #         splitted[22:-1])+'\t'+"{:.3f}".format(mmblg_cfd_diff)+'\t'+"{:.3f}".format(mmblg_abs_diff)+"\t"+splitted[-1]+'\n')
-            # else:
-            #     fout.write('\t'.join(splitted[:22])+'\t'+"{:.3f}".format(cfd_diff)+'\t'+"{:.3f}".format(abs_diff)+"\t"+"\t".join(
-            #         splitted[22:])+'\t'+"{:.3f}".format(mmblg_cfd_diff)+'\t'+"{:.3f}".format(mmblg_abs_diff)+'\n')
@@ -1,10 +1,21 @@
 #!/usr/bin/env python
 
 import time
-from intervaltree import Interval, IntervalTree
+from heapq import heappop, heappush
+import csv
 import sys
 import warnings
 
+import numpy as np
+import pandas as pd
+
+try:
+    from numba import njit
+except ImportError:  # numba not available, run the sweep as plain Python
+
+    def njit(*args, **kwargs):
+        return lambda func: func
+
 warnings.filterwarnings("ignore", category=FutureWarning)
 warnings.filterwarnings("ignore", category=UserWarning)
 
@@ -12,65 +23,131 @@ file_final_results = sys.argv[1]
 inAnnotationFile = sys.argv[2]
 file_annotated = sys.argv[3]
 
+# number of result lines annotated at once
+CHUNK_SIZE = 200000
+
+
+def load_annotations(annotation_file):
+    """Read the annotation BED into per-chromosome arrays sorted by start.
+
+    Each chromosome maps to (starts, ends, labels, max_ends), where max_ends
+    is the running maximum of ends, used to skip intervals ending before a
+    query position.
+    """
+    annotationDict = dict()
+    if "vuoto.txt" in annotation_file:
+        return annotationDict
+    annotations = pd.read_csv(
+        annotation_file,
+        sep="\t",
+        header=None,
+        usecols=[0, 1, 2, 3],
+        names=["chrom", "start", "end", "label"],
+        dtype={"chrom": str, "start": np.int64, "end": np.int64, "label": str},
+        keep_default_na=False,
+        quoting=csv.QUOTE_NONE,
+    )
+    annotations["label"] = annotations["label"].str.strip()
+    annotations = annotations.loc[annotations["start"] < annotations["end"]]
+    annotations = annotations.drop_duplicates().sort_values(
+        ["chrom", "start", "end", "label"]
+    )
+    for chrom, chrom_annotations in annotations.groupby("chrom", sort=False):
+        ends = chrom_annotations["end"].to_numpy()
+        annotationDict[chrom] = (
+            chrom_annotations["start"].to_numpy(),
+            ends,
+            chrom_annotations["label"].to_numpy(dtype=object),
+            np.maximum.accumulate(ends),
+        )
+    return annotationDict
+
+
+@njit(cache=True)
+def sweep(query_starts, query_stops, starts, ends, max_ends):
+    """Return the (query, annotation) index pairs of overlapping intervals.
+
+    Queries must be sorted by start. Annotations are swept keeping a heap of
+    the intervals still active, ordered by end.
+    """
+    # typed empty lists (numba infers list types from their first element)
+    query_hits = [np.int64(0)]
+    annotation_hits = [np.int64(0)]
+    active = [(np.int64(0), np.int64(0), np.int64(0))]
+    query_hits.pop()
+    annotation_hits.pop()
+    active.pop()
+    if query_starts.size > 0:
+        # intervals before this index end before the first query starts
+        j = np.searchsorted(max_ends, query_starts[0], side="right")
+        for i in range(query_starts.size):
+            start, stop = query_starts[i], query_stops[i]
+            while j < starts.size and starts[j] < stop:
+                heappush(active, (ends[j], starts[j], np.int64(j)))
+                j += 1
+            while len(active) > 0 and active[0][0] <= start:
+                heappop(active)
+            for k in range(len(active)):
+                if active[k][1] < stop:
+                    query_hits.append(np.int64(i))
+                    annotation_hits.append(active[k][2])
+    return np.array(query_hits, dtype=np.int64), np.array(annotation_hits, dtype=np.int64)
+
+
+def annotate_chunk(chunk, annotationDict):
+    """Set the annotation column (bestCFD) of a block of result rows."""
+    chroms = chunk[4].to_numpy()
+    query_starts = chunk[5].to_numpy(dtype=np.int64)
+    guide_lengths = chunk[1].str.replace("-", "").str.len().to_numpy(dtype=np.int64)
+    query_stops = query_starts + guide_lengths + 1
+    hits_rows, hits_labels = list(), list()
+    for chrom in pd.unique(chroms):
+        if chrom not in annotationDict:
+            continue
+        starts, ends, labels, max_ends = annotationDict[chrom]
+        rows = np.flatnonzero(chroms == chrom)
+        rows = rows[np.argsort(query_starts[rows], kind="stable")]
+        query_hits, annotation_hits = sweep(
+            np.ascontiguousarray(query_starts[rows]),
+            np.ascontiguousarray(query_stops[rows]),
+            starts,
+            ends,
+            max_ends,
+        )
+        hits_rows.append(rows[query_hits])
+        hits_labels.append(labels[annotation_hits])
+    annotation = pd.Series("n", index=range(len(chunk)), dtype=object)
+    if hits_rows:
+        hits = pd.Series(np.concatenate(hits_labels), index=np.concatenate(hits_rows))
+        found = hits.groupby(level=0).agg(lambda s: ",".join(sorted(set(s))))
+        annotation[found.index] = found.to_numpy()
+    chunk[14] = annotation.to_numpy()  # bestCFD
+    return chunk
+
+
 print("Starting annotation")
 start_time = time.time()
-annotationDict = dict()
-# annotationsTree = IntervalTree()
-# annotationsSet = set()
-# guidesSet = set()       #NOTE/BUG if guide finds 0 targets, it will not be annotated
-
-with open(inAnnotationFile, "r") as annotations:
-    for line in annotations:
-        x = line.split("\t")
-        if "vuoto.txt" in inAnnotationFile:
-            break
-        annotations_list = str(x[3]).strip()
-        if str(x[0]) in annotationDict.keys():
-            annotationDict[str(x[0])][int(x[1]) : int(x[2])] = (
-                str(x[0]) + "\t" + annotations_list
-            )
-        else:
-            annotationDict[str(x[0])] = IntervalTree()
-            annotationDict[str(x[0])][int(x[1]) : int(x[2])] = (
-                str(x[0]) + "\t" + annotations_list
-            )
-        # annotationsSet.add(annotations_list)
-
+annotationDict = load_annotations(inAnnotationFile)
 
 with open(file_final_results, "r") as f_in:
     with open(file_annotated, "w") as f_out:
         header = f_in.readline()
         f_out.write(header)
-        for line in f_in:
-            splitted = line.rstrip().split("\t")
-            guide_no_bulge = splitted[1].replace("-", "")
-            # Calcolo annotazioni
-            foundAnnotations = list()
-            if str(splitted[4]) in annotationDict.keys():
-                foundAnnotations = list(
-                    annotationDict[str(splitted[4])][
-                        int(splitted[5]) : (
-                            int(splitted[5]) + int(len(guide_no_bulge)) + 1
-                        )
-                    ]
-                )
-            # sorted(annotationsTree[int(splitted[5]):(int(splitted[5])+int(len(guide_no_bulge))+1)])
-            string_annotation = list()
-            found_bool = False
-            for found in range(0, len(foundAnnotations)):
-                guide = foundAnnotations[found].data
-                guideSplit = guide.split("\t")
-                # if(str(guideSplit[0]) == str(splitted[4])):
-                found_bool = True
-                string_annotation.append(str(guideSplit[1]))
-            if not found_bool:
-                last_annotation = "n"
-            else:
-                last_annotation = ",".join(list(set(string_annotation)))
-            splitted[14] = last_annotation  # bestCFD
-            # splitted[36] = last_annotation #fewestMM_BUL
-            # splitted[58] = last_annotation #bestCRISTA
-
-            f_out.write("\t".join(splitted) + "\n")
+        try:
+            chunks = pd.read_csv(
+                f_in,
+                sep="\t",
+                header=None,
+                dtype=str,
+                keep_default_na=False,
+                quoting=csv.QUOTE_NONE,
+                chunksize=CHUNK_SIZE,
+            )
+        except pd.errors.EmptyDataError:  # header only (e.g. no variant targets)
+            chunks = []
+        for chunk in chunks:
+            annotate_chunk(chunk.reset_index(drop=True), annotationDict).to_csv(
+                f_out, sep="\t", header=False, index=False, quoting=csv.QUOTE_NONE
+            )
 
 print(f"Annotation done in {time.time()-start_time}")
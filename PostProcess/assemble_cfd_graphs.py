@@ -21,25 +21,27 @@ for f in os.listdir(output_dir):
         else:
             files_true.append(f)
 
+
+def sum_graphs(graph_files):
+    # accumulate the (101 x 2) CFD distributions directly on a NumPy buffer
+    cumulative_graph = np.zeros([101, 2], dtype=np.int64)
+    for f in graph_files:
+        cumulative_graph += pd.read_csv(
+            f, sep="\t", usecols=["ref", "var"], dtype=np.int64
+        ).to_numpy()
+        os.remove(f)
+    return cumulative_graph
+
+
 os.chdir(output_dir)
 if files_fake:
-    empty_m = np.zeros([101, 2])
-    cumulative_graph_fake = pd.DataFrame(empty_m, columns=["ref", "var"])
-    for f in files_fake:
-        df = pd.read_csv(f, sep="\t")
-        cumulative_graph_fake = cumulative_graph_fake.add(df)
-        os.system(f"rm {f}")
-
-    cumulative_graph_fake = cumulative_graph_fake.astype("int64")
-    cumulative_graph_fake.to_csv("indels.CFDGraph.txt", sep="\t", index=False)
+    cumulative_graph_fake = sum_graphs(files_fake)
+    pd.DataFrame(cumulative_graph_fake, columns=["ref", "var"]).to_csv(
+        "indels.CFDGraph.txt", sep="\t", index=False
+    )
 
 if files_true:
-    empty_m = np.zeros([101, 2])
-    cumulative_graph_true = pd.DataFrame(empty_m, columns=["ref", "var"])
-    for f in files_true:
-        df = pd.read_csv(f, sep="\t")
-        cumulative_graph_true = cumulative_graph_true.add(df)
-        os.system(f"rm {f}")
-
-    cumulative_graph_true = cumulative_graph_true.astype("int64")
-    cumulative_graph_true.to_csv("snps.CFDGraph.txt", sep="\t", index=False)
+    cumulative_graph_true = sum_graphs(files_true)
+    pd.DataFrame(cumulative_graph_true, columns=["ref", "var"]).to_csv(
+        "snps.CFDGraph.txt", sep="\t", index=False
+    )
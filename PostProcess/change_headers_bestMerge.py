@@ -8,20 +8,20 @@ Created on Sat May 29 18:02:45 2021
 """
 Script used to convert from old bestMerge format to new alt_results format
 """
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+import itertools
 import pandas as pd
 import numpy as np
+import os
 import sys
 import warnings
 
 warnings.simplefilter(action="ignore", category=FutureWarning)
 
-in_path = sys.argv[1]
-out_path = sys.argv[2]
-
-chunksize_ = 5000000000000
-
-# if not isFileLocked(in_path):
-chunks = pd.read_csv(in_path, sep="\t", chunksize=chunksize_, na_filter=False)
+chunksize_ = 1000000
+# low cardinality text columns, parsed as categories
+dtypes = {"Chromosome": "category", "Annotation_Type": "category", "rsID": "category"}
 
 new_order = [
     "Real_Guide",
@@ -131,56 +131,92 @@ new_names = [
 ]
 
 
-header = True
-for chunk in chunks:
 
+def _transform(chunk):
+    """Reorder, rename and clean a chunk of bestMerge rows to the new format"""
     chunk = chunk[new_order]
     chunk = chunk.drop(to_remove, axis=1)
     chunk.columns = new_names
     # chunk[chunk.columns.difference(['Not_found_in_REF'])] = chunk[chunk.columns.difference(['Not_found_in_REF'])].replace('n', 'NA')
-    chunk = chunk.replace("n", "NA")
-    # chunk = chunk.replace(regex=['\*.,\*', '\*,.\*'], value='NA')
-    chunk["Variant_rsID_(highest_CFD)"] = chunk[
-        "Variant_rsID_(highest_CFD)"
-    ].str.replace(".", "NA")
-    mask = chunk["Aligned_protospacer+PAM_REF_(highest_CFD)"] == "NA"
-    chunk["Aligned_protospacer+PAM_REF_corrected_(highest_CFD)"] = np.where(
-        mask,
-        chunk["Aligned_protospacer+PAM_ALT_(highest_CFD)"],
-        chunk["Aligned_protospacer+PAM_REF_(highest_CFD)"],
-    )
-    chunk["Aligned_protospacer+PAM_ALT_(highest_CFD)"] = np.where(
-        mask,
-        chunk["Aligned_protospacer+PAM_REF_(highest_CFD)"],
-        chunk["Aligned_protospacer+PAM_ALT_(highest_CFD)"],
-    )
-
-    chunk["Aligned_protospacer+PAM_REF_(highest_CFD)"] = chunk[
-        "Aligned_protospacer+PAM_REF_corrected_(highest_CFD)"
-    ]
-    chunk.drop(
-        "Aligned_protospacer+PAM_REF_corrected_(highest_CFD)", axis=1, inplace=True
+    categorical = chunk.columns[chunk.dtypes == "category"]
+    chunk = chunk.replace(
+        {col: "n" for col in chunk.columns.difference(categorical)}, "NA"
     )
-
-    mask = chunk["Aligned_protospacer+PAM_REF_(fewest_mm+b)"] == "NA"
-    chunk["Aligned_protospacer+PAM_REF_corrected_(fewest_mm+b)"] = np.where(
-        mask,
-        chunk["Aligned_protospacer+PAM_ALT_(fewest_mm+b)"],
-        chunk["Aligned_protospacer+PAM_REF_(fewest_mm+b)"],
-    )
-    chunk["Aligned_protospacer+PAM_ALT_(fewest_mm+b)"] = np.where(
-        mask,
-        chunk["Aligned_protospacer+PAM_REF_(fewest_mm+b)"],
-        chunk["Aligned_protospacer+PAM_ALT_(fewest_mm+b)"],
+    # chunk = chunk.replace(regex=['\*.,\*', '\*,.\*'], value='NA')
+    # replace on the categories only, not on every row
+    for col in categorical:
+        cats = chunk[col].cat.categories
+        chunk[col] = chunk[col].map(dict(zip(cats, cats.where(cats != "n", "NA"))))
+    rsids = chunk["Variant_rsID_(highest_CFD)"].astype("category")
+    chunk["Variant_rsID_(highest_CFD)"] = rsids.map(
+        dict(zip(rsids.cat.categories, rsids.cat.categories.str.replace(".", "NA")))
     )
-
-    chunk["Aligned_protospacer+PAM_REF_(fewest_mm+b)"] = chunk[
-        "Aligned_protospacer+PAM_REF_corrected_(fewest_mm+b)"
+    # targets found only in ALT have no REF protospacer, swap REF and ALT for them
+    for criterion in ("highest_CFD", "fewest_mm+b"):
+        ref_col = f"Aligned_protospacer+PAM_REF_({criterion})"
+        alt_col = f"Aligned_protospacer+PAM_ALT_({criterion})"
+        ref_arr = chunk[ref_col].to_numpy()
+        alt_arr = chunk[alt_col].to_numpy()
+        mask = ref_arr == "NA"
+        chunk[ref_col] = np.where(mask, alt_arr, ref_arr)
+        chunk[alt_col] = np.where(mask, ref_arr, alt_arr)
+    return chunk
+
+
+if __name__ == "__main__":
+    in_path = sys.argv[1]
+    out_path = sys.argv[2]
+    # optional number of processes transforming the chunks (default: all cores)
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else os.cpu_count() or 1
+
+    # if not isFileLocked(in_path):
+    try:
+        import pyarrow  # multithreaded parser, reads the whole table at once
+
+        table = pd.read_csv(
+            in_path, sep="\t", na_filter=False, dtype=dtypes, engine="pyarrow"
+        )
+        chunks = (
+            table.iloc[start : start + chunksize_]
+            for start in range(0, max(len(table), 1), chunksize_)
+        )
+    except (ImportError, ValueError):  # no pyarrow, or it cannot parse the file
+        chunks = pd.read_csv(
+            in_path, sep="\t", chunksize=chunksize_, na_filter=False, dtype=dtypes
+        )
+
+    # peek at two chunks: worker processes only help with more than one
+    chunks = iter(chunks)
+    first_chunks = [
+        chunk for chunk in (next(chunks, None), next(chunks, None)) if chunk is not None
     ]
-    chunk.drop(
-        "Aligned_protospacer+PAM_REF_corrected_(fewest_mm+b)", axis=1, inplace=True
-    )
-
-    chunk.to_csv(out_path, header=header, mode="w", sep="\t", index=False, na_rep="NA")
-
-    header = False
+    parallel = workers > 1 and len(first_chunks) > 1
+    chunks = itertools.chain(first_chunks, chunks)
+    out_handle = open(out_path, "w")
+    header = True
+    if not parallel:
+        # small inputs (e.g. the cluster grep of the results page) are transformed
+        # inline, without forking worker processes
+        for chunk in chunks:
+            _transform(chunk).to_csv(
+                out_handle, header=header, sep="\t", index=False, na_rep="NA"
+            )
+            header = False
+    else:
+        # chunks are transformed in parallel and written in input order, keeping
+        # only a few of them in flight to bound memory
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(executor.submit(_transform, chunk))
+                while len(pending) > workers or (pending and pending[0].done()):
+                    pending.popleft().result().to_csv(
+                        out_handle, header=header, sep="\t", index=False, na_rep="NA"
+                    )
+                    header = False
+            while pending:
+                pending.popleft().result().to_csv(
+                    out_handle, header=header, sep="\t", index=False, na_rep="NA"
+                )
+                header = False
+    out_handle.close()
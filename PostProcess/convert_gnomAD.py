@@ -1,5 +1,7 @@
 #!/usr/bin/env python
 
+import subprocess
+import shutil
 import gzip
 import sys
 import glob
@@ -15,57 +17,101 @@ except:
     threads = len(os.sched_getaffinity(0)) - 2
 
 
+def openVCF(inVCF):
+    # decompress the BGZF input with bgzip (multithreaded, in a separate process)
+    # when available, otherwise fall back to single threaded gzip
+    if shutil.which("bgzip") is None:
+        return gzip.open(inVCF, "rb"), None
+    bgzip = subprocess.Popen(
+        ["bgzip", "-d", "-c", "-@", "2", inVCF],
+        stdout=subprocess.PIPE,
+        bufsize=1 << 20,
+    )
+    return bgzip.stdout, bgzip
+
+
 def convertVCF(inVCF):
-    # open VCF file
-    outVCFname = inVCF.replace("bgz", "gz")
-    outVCF = gzip.open(inVCF.replace("bgz", "gz"), "wt")
-    inVCF = gzip.open(inVCF, "rt")
-
-    # read samplesID from file
-    header = list()
-    popDict = dict()
-    for pop in inPop:
-        if "#" in pop:
-            continue
-        popDict[pop.split()[0].strip()] = "0/0"
-
-    # read header from original VCF
-    for line in inVCF:
-        if "##" in line:
-            header.append(line.strip())
-        else:
-            popheader = "\t".join(popDict.keys())
-            header.append(
-                '##FORMAT=<ID=GT,Number=1,Type=String,Description="Sample Collapsed Genotype">'
+    # open VCF file (VCFs are ASCII, read and write raw bytes to skip decoding)
+    # converted lines are streamed uncompressed into bcftools norm, no temp file
+    bcftools, outVCFname = bcftools_merging(inVCF.replace("bgz", "gz"))
+    outVCF = bcftools.stdin
+    inFile, bgzip = None, None
+    try:
+        inFile, bgzip = openVCF(inVCF)
+
+        # read samplesID from file
+        header = list()
+        popDict = dict()
+        for pop in inPop:
+            if "#" in pop:
+                continue
+            popDict[pop.split()[0].strip().encode()] = b"0/0"
+
+        # read header from original VCF
+        for line in inFile:
+            if b"##" in line:
+                header.append(line.strip())
+            else:
+                popheader = b"\t".join(popDict.keys())
+                header.append(
+                    b'##FORMAT=<ID=GT,Number=1,Type=String,Description="Sample Collapsed Genotype">'
+                )
+                header.append(line.strip() + b"\tFORMAT" + b"\t" + popheader + b"\n")
+                break
+        # insert header into new VCF
+        outVCF.write(b"\n".join(header))
+
+        # INFO keys storing the AC of each gnomAD population
+        popKeys = [(pop, b"AC_" + pop) for pop in popDict]
+        # converted lines are buffered and written in ~1MB blocks
+        outBuffer = list()
+        outBufferSize = 0
+        # read each variant into the VCF
+        for line in inFile:
+            split = line.strip().split(b"\t")
+            if split[6] != b"PASS":  # skip rows with no PASS in FILTER
+                continue
+            info = split[7].strip().split(b";")
+            infoDict = dict(data.split(b"=", 1) for data in info if b"=" in data)
+            # read AC for each gnomAD population and insert a fake GT for each sample
+            for pop, key in popKeys:
+                ACvalue = infoDict.get(key)
+                popDict[pop] = b"0/1" if ACvalue and int(ACvalue) > 0 else b"0/0"
+            split[7] = info[2]
+            # write each line passing the filtering into the new VCF
+            outLine = (
+                b"\t".join(split[:8]) + b"\tGT\t" + b"\t".join(popDict.values()) + b"\n"
             )
-            header.append(line.strip() + "\tFORMAT" + "\t" + popheader + "\n")
-            break
-    # insert header into new VCF
-    outVCF.write("\n".join(header))
-
-    # read each variant into the VCF
-    for line in inVCF:
-        split = line.strip().split("\t")
-        if split[6] != "PASS":  # skip rows with no PASS in FILTER
-            continue
-        info = split[7].strip().split(";")
-        for pop in popDict:
-            popDict[pop] = "0/0"
-            for index, data in enumerate(
-                info
-            ):  # read AC for each gnomAD population and insert a fake GT for each sample
-                if "AC_" + str(pop) + "=" in data:
-                    ACvalue = int(data.strip().split("=")[1])
-                    if ACvalue > 0:
-                        popDict[pop] = "0/1"
-        split[7] = info[2]
-        # write each line passing the filtering into the new VCF
-        outVCF.write(
-            "\t".join(split[:8]) + "\tGT\t" + "\t".join(popDict.values()) + "\n"
-        )
-
-    inVCF.close()
-    outVCF.close()
+            outBuffer.append(outLine)
+            outBufferSize += len(outLine)
+            if outBufferSize >= 1 << 20:
+                outVCF.write(b"".join(outBuffer))
+                outBuffer.clear()
+                outBufferSize = 0
+        outVCF.write(b"".join(outBuffer))
+
+        inFile.close()
+        if bgzip is not None and bgzip.wait() != 0:
+            raise subprocess.SubprocessError(f"bgzip failed decompressing {inVCF}")
+        outVCF.close()
+        if bcftools.wait() != 0:
+            raise subprocess.SubprocessError(f"bcftools norm failed writing {outVCFname}")
+    except BaseException:
+        # stop the child processes and remove the truncated output, a later run
+        # would otherwise take it for a converted VCF
+        for process in (bgzip, bcftools):
+            if process is not None:
+                process.kill()
+                process.wait()
+        for handle in (inFile, outVCF):
+            try:
+                if handle is not None:
+                    handle.close()
+            except OSError:  # pipe to a killed process
+                pass
+        if os.path.exists(outVCFname):
+            os.remove(outVCFname)
+        raise
     return outVCFname
 
 
@@ -74,24 +120,27 @@ def bcftools_merging(outVCFname):
     tempName = outVCFname.strip().split(".")
     tempName[-3] = tempName[-3] + ".collapsed"
     finalOutVCF = ".".join(tempName)
-    os.system(f"bcftools norm -m+ -O z -o {finalOutVCF} {outVCFname}")
+    # bcftools reads the VCF from its stdin, the returned process is fed by the
+    # caller; returns the process and the path of the VCF it writes
+    bcftools = subprocess.Popen(
+        ["bcftools", "norm", "-m+", "-O", "z", "-o", finalOutVCF, "-"],
+        stdin=subprocess.PIPE,
+        bufsize=1 << 20,
+    )
+    return bcftools, finalOutVCF
 
 
 def full_process(inVCF):
     # function to process each VCF from initial conversion to collapsing multi-variant alleles with shared reference into one entry
-    outVCFname = convertVCF(
+    convertVCF(
         inVCF
-    )  # convert VCF from gnomADv3.1 to VCF4.2 compatible with CRISRPme
-    bcftools_merging(outVCFname)  # merge multi-variant alleles into single entry
-    os.system(f"rm -f {outVCFname}")  # removed unused temp vcf file
+    )  # convert VCF from gnomADv3.1 to VCF4.2 compatible with CRISRPme, merging multi-variant alleles on the fly
 
 
 if __name__ == "__main__":
-    pool = multiprocessing.Pool(threads)
     # call convert vcf for each vcf in dir
     listVCF = glob.glob(vcfDIR + "/*.vcf.bgz")
-    for inVCF in listVCF:
-        pool.apply_async(full_process, args=(inVCF,))
-    # wait until all threads are completed than join
-    pool.close()
-    pool.join()
+    with multiprocessing.Pool(threads) as pool:
+        # consume results as they complete, so errors in workers are raised here
+        for _ in pool.imap_unordered(full_process, listVCF, chunksize=1):
+            pass
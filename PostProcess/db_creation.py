@@ -6,6 +6,7 @@ Created on Tue Jun  8 11:48:20 2021
 """
 
 import sqlite3
+import csv
 import time
 import sys
 import pandas as pd
@@ -49,21 +50,17 @@ c = conn.cursor()
 #     header = f.readline().split()
 #     for line in f:
 #         tot_lines += 1
-db_schema = []
 try:
+    # infer column types from a small sample of the table
     df = pd.read_csv(fileIn, sep="\t", index_col=False, na_filter=False, nrows=1000)
+    cols = list(df.columns)
     types = [dict_pd_dtypes_to_sql_types(pd_dtype) for pd_dtype in df.dtypes]
-
-    for i, col in enumerate(df.columns):
-        db_schema.append(f'"{col}" {types[i]}')
-
-    db_schema = ", ".join(db_schema)
-except:
+except (pd.errors.ParserError, ValueError):
+    # fall back to untyped columns, reading the header only
     with open(fileIn) as f_in:
-        cols = f_in.readline().strip().split("\t")
-        for col in cols:
-            db_schema.append(f'"{col}" TEXT')
-        db_schema = ", ".join(db_schema)
+        cols = next(csv.reader(f_in, delimiter="\t", quoting=csv.QUOTE_NONE))
+    types = ["TEXT"] * len(cols)
+db_schema = ", ".join(f'"{col}" {sql_type}' for col, sql_type in zip(cols, types))
 # print(db_schema)
 
 q = f"CREATE TABLE IF NOT EXISTS final_table ({db_schema})"
@@ -71,31 +68,20 @@ q = f"CREATE TABLE IF NOT EXISTS final_table ({db_schema})"
 c.execute(q)
 
 
-def insert(data):
-    print("Inserting chunk of data")
-    question_marks = ["?"] * len(data[0])
-    question_marks = ",".join(question_marks)
-    c.executemany(f"INSERT INTO final_table VALUES ({question_marks})", data)
-    conn.commit()
-
+# bulk load settings, the database is rebuilt from scratch if the job fails
+c.execute("PRAGMA journal_mode=MEMORY")
+c.execute("PRAGMA synchronous=OFF")
+c.execute("PRAGMA temp_store=MEMORY")
 
 with open(f"{fileIn}", "r") as f:
-    a = []
-    data = []
-    y = 0
     start_time = time.time()
-    for line in f:
-        if y == 0:
-            line.split()
-            y = y + 1
-        else:
-            g = line.strip().split("\t")
-            data.append(g)
-            if len(data) == 500000:  # stop to small enough chunks of data
-                insert(data)
-                data = []
-    if len(data) != 0:  # insert last chunk of data
-        insert(data)
+    reader = csv.reader(f, delimiter="\t", quoting=csv.QUOTE_NONE)
+    next(reader)  # skip header
+    print("Inserting data")
+    question_marks = ",".join(["?"] * len(cols))
+    # stream the rows straight from the parser, inside a single transaction
+    c.executemany(f"INSERT INTO final_table VALUES ({question_marks})", reader)
+    conn.commit()
     # create indexes
     print("Now creating indexes")
 
@@ -110,15 +96,11 @@ with open(f"{fileIn}", "r") as f:
     chrom_column = "Chromosome"
     bulge_t_column = "Bulge_type_(highest_CFD)"
 
-    c.execute(
-        f'CREATE INDEX IF NOT EXISTS g_mm ON final_table("{guide_column}","{mm_column}")'
-    )
-    c.execute(
-        f'CREATE INDEX IF NOT EXISTS g_blg ON final_table("{guide_column}","{blg_column}")'
-    )
-    c.execute(
-        f'CREATE INDEX IF NOT EXISTS g_tot ON final_table("{guide_column}","{total_column}")'
-    )
+    # larger page cache to sort in memory while indexing, build all indexes in
+    # one transaction; (guide, mm), (guide, bulges) and (guide, total) lookups
+    # are served by the prefixes of the compound indexes below
+    c.execute("PRAGMA cache_size=-262144")
+    c.execute("BEGIN")
     c.execute(
         f'CREATE INDEX IF NOT EXISTS g_cfd ON final_table("{guide_column}","{cfd_column}")'
     )
@@ -150,6 +132,24 @@ with open(f"{fileIn}", "r") as f:
     c.execute(
         f'CREATE INDEX IF NOT EXISTS g_tot_cfd ON final_table("{guide_column}","{total_column}","{cfd_column}")'
     )
+    # results table ordered on the fewest_mm+b (or CRISTA) targets, one index per
+    # ordering column so paged ORDER BY ... LIMIT queries scan the index
+    for prefix, criterion, score in (
+        ("f", "fewest_mm+b", "CFD"),
+        ("c", "highest_CRISTA", "CRISTA"),
+    ):
+        for name, column in (
+            ("mm", "Mismatches"),
+            ("blg", "Bulges"),
+            ("tot", "Mismatches+bulges"),
+            ("score", f"{score}_score"),
+            ("risk", f"{score}_risk_score"),
+        ):
+            order_column = f"{column}_({criterion})"
+            if order_column in cols:
+                c.execute(
+                    f'CREATE INDEX IF NOT EXISTS {prefix}_{name} ON final_table("{guide_column}","{order_column}")'
+                )
 
     conn.commit()
     conn.close()
@@ -17,6 +17,7 @@ import scipy.spatial.distance as sp
 from math import pi
 import pandas as pd
 from matplotlib import patches as mpatches
+from matplotlib.collections import PolyCollection
 from matplotlib import pyplot as plt
 import math
 import matplotlib
@@ -25,6 +26,11 @@ import random
 import multiprocessing
 import json
 
+try:
+    import orjson  # parses large JSON dicts faster than the json module
+except ImportError:  # orjson not available, use the standard json module
+    orjson = None
+
 # matplotlib.use("TkAgg")
 matplotlib.use("Agg")
 
@@ -60,10 +66,10 @@ if web_server:
     file_extension = "png"
 
 
-def chunks(lst, n):
-    """Yield successive n-sized chunks from lst."""
-    for i in range(0, len(lst), n):
-        yield lst[i : i + n]
+def radarChartAngles(count):
+    """Return the angle of each radar chart axis, the first repeated to close it."""
+    angles = tuple(n / float(count) * 2 * pi for n in range(count))
+    return angles + angles[:1]
 
 
 def generatePlot(guide, guideDict, motifDict, mismatch, bulge, source):
@@ -76,84 +82,60 @@ def generatePlot(guide, guideDict, motifDict, mismatch, bulge, source):
     titlesize = 18
     fontsize = 17
 
-    percentage_list = []
-    for elem in guideDict:
-        if float(guideDict["General"]) != 0:
-            percentage_list.append(
-                round(float(guideDict[elem]) * 100 / float(guideDict["General"]), 2)
-            )
-        else:
-            percentage_list.append(round(float(0), 0))
-
-    guideDataFrame = pd.DataFrame.from_dict(guideDict, orient="index")
-
-    guideDataFrame["Percentage"] = percentage_list
-    guideDataFrame.columns = ["Count", "Percentage"]
-
-    try:
-        # dataframe for table creation
-        dataframe_table = guideDataFrame.loc[
-            [
-                "General",
-                "three_prime_UTR",
-                "five_prime_UTR",
-                "exon",
-                "CDS",
-                "gene",
-                "DNase-H3K4me3",
-                "CTCF-only",
-                "dELS",
-                "pELS",
-                "PLS",
-            ]
-        ]
-        # dataframe_table = guideDataFrame.loc[[
-        #     'General', '', 'pELS', 'dELS', 'PLS', '', 'exon', 'gene', 'CDS', '', '']]
-        dataframe_table.rename(
-            index={
-                "CTCF-only": "CTCF",
-                "General": "Total",
-                "three_prime_UTR": "3'UTR",
-                "five_prime_UTR": "5'UTR",
-            },
-            inplace=True,
+    # General is never 0 here, combinations without targets are skipped above
+    counts = np.fromiter(guideDict.values(), dtype=float, count=len(guideDict))
+    percentage_list = np.round(counts * 100 / guideDict["General"], 2)
+
+    percentages = dict(zip(guideDict, percentage_list))
+
+    # annotations shown in the table, with their display names
+    table_names = {
+        "General": "Total",
+        "three_prime_UTR": "3'UTR",
+        "five_prime_UTR": "5'UTR",
+        "exon": "exon",
+        "CDS": "CDS",
+        "gene": "gene",
+        "DNase-H3K4me3": "DNase-H3K4me3",
+        "CTCF-only": "CTCF",
+        "dELS": "dELS",
+        "pELS": "pELS",
+        "PLS": "PLS",
+    }
+    # table rows as (name, count, percentage), the radar chart drops the total
+    if all(annotation in guideDict for annotation in table_names):
+        table_rows = sorted(
+            (
+                (name, int(guideDict[annotation]), percentages[annotation])
+                for annotation, name in table_names.items()
+            ),
+            key=lambda row: row[2],
+            reverse=True,
         )
-        dataframe_table.sort_values(by=["Percentage"], ascending=False, inplace=True)
-    except:
-        dataframe_table = guideDataFrame.loc[["General"]]
-        dataframe_table.rename(index={"General": "Total"}, inplace=True)
-
-    # print(dataframe_table)
-
-    # dataframe for radar chart, drop total column
-    if len(list(dataframe_table.T)[0:]) > 1:
-        dataframe_radar_chart = dataframe_table.drop(["Total"])
+        radar_chart_rows = [row for row in table_rows if row[0] != "Total"]
     else:
-        dataframe_radar_chart = dataframe_table
+        table_rows = [("Total", int(guideDict["General"]), percentages["General"])]
+        radar_chart_rows = table_rows
 
-    dataframe_radar_chart = dataframe_radar_chart.T
-
-    categories_radar_chart = list(dataframe_radar_chart)[0:]
-    categories_table = list(dataframe_table.T)[0:]
+    categories_radar_chart = [row[0] for row in radar_chart_rows]
+    categories_table = [row[0] for row in table_rows]
 
     count_radar_chart_categories = len(categories_radar_chart)
 
     # We are going to plot the first line of the data frame.
     # But we need to repeat the first value to close the circular graph:
-    values_radar_chart = (
-        dataframe_radar_chart.loc["Percentage"].values.flatten().tolist()
-    )
+    values_radar_chart = [float(row[2]) for row in radar_chart_rows]
     values_radar_chart += values_radar_chart[:1]
 
     # What will be the angle of each axis in the plot? (we divide the plot / number of variable)
-    angles_radar_chart = [
-        n / float(count_radar_chart_categories) * 2 * pi
-        for n in range(count_radar_chart_categories)
-    ]
-    angles_radar_chart += angles_radar_chart[:1]
+    angles_radar_chart = radarChartAngles(count_radar_chart_categories)
 
-    # Initialise the spider plot
-    ax = plt.subplot(2, 2, 1, polar=True)
+    # Initialise the spider plot, the table and the motif axes (the tight layout
+    # is solved while drawing in savefig, not in a separate pass)
+    fig = plt.figure(tight_layout=True)
+    ax = fig.add_subplot(2, 2, 1, polar=True)
+    ax_table = fig.add_subplot(2, 2, 2)
+    motif = fig.add_subplot(2, 1, 2, frameon=False)
 
     for label, rot in zip(ax.get_xticklabels(), angles_radar_chart):
         if rot == 0:
@@ -167,29 +149,23 @@ def generatePlot(guide, guideDict, motifDict, mismatch, bulge, source):
 
     # Draw one axe per variable + add labels labels yet
     # plt.xticks(angles[:-1], categories, color='black', size=fontsize)
-    plt.xticks(
-        angles_radar_chart[:-1], categories_radar_chart, color="black", size=fontsize
-    )
+    ax.set_xticks(angles_radar_chart[:-1])
+    ax.set_xticklabels(categories_radar_chart, color="black", size=fontsize)
 
     # Draw ylabels
     # # # Draw ylabels
     ax.set_rlabel_position(0)
-    max_value_radar_chart = round(max(values_radar_chart))
     # round to upper 10 multiple
-    while int(max_value_radar_chart % 10):
-        max_value_radar_chart = max_value_radar_chart + 1
+    max_value_radar_chart = -(-round(max(values_radar_chart)) // 10) * 10
 
-    radar_chart_yticks = [elem for elem in range(0, max_value_radar_chart, 10)]
-    radar_chart_yticks_labels = [
-        str(elem) for elem in range(0, max_value_radar_chart, 10)
-    ]
+    radar_chart_yticks = np.arange(0, max_value_radar_chart, 10)
+    radar_chart_yticks_labels = [str(elem) for elem in radar_chart_yticks]
     # plt.yticks([0, 0.25, 0.50, 0.75], ["0", "0.25", "0.50", "0.75"], color="black", size=12)
     # plt.yticks([0, 25, 50, 75], ["0", "25", "50", "75"], color="black", size=fontsize-2)
-    plt.yticks(
-        radar_chart_yticks, radar_chart_yticks_labels, color="black", size=fontsize
-    )
+    ax.set_yticks(radar_chart_yticks)
+    ax.set_yticklabels(radar_chart_yticks_labels, color="black", size=fontsize)
     # plt.ylim(0, 1)
-    plt.ylim(0, max_value_radar_chart)
+    ax.set_ylim(0, max_value_radar_chart)
 
     # Fill area
     ax.fill(angles_radar_chart, values_radar_chart, "b", alpha=0.1)
@@ -200,22 +176,10 @@ def generatePlot(guide, guideDict, motifDict, mismatch, bulge, source):
     # Plot data
     ax.plot(angles_radar_chart, values_radar_chart, linewidth=1, linestyle="solid")
 
-    plt.subplot(2, 2, 2)
-    transpose_list = list()
-    # dataframe_table = dataframe_table.T
-    for elem in categories_table:
-        transpose_list.append(list(dataframe_table.loc[elem]))
-    templist = list()
-    for couple in transpose_list:
-        couple[0] = int(couple[0])
-        templist.append(couple)
-    # templist to convert into only the total column
-    transpose_list = templist
-
-    # print('transp list', transpose_list)
-
-    plt.axis("off")
-    table = plt.table(
+    transpose_list = [[count, percentage] for _, count, percentage in table_rows]
+
+    ax_table.axis("off")
+    table = ax_table.table(
         cellText=transpose_list,
         rowLabels=categories_table,
         colLabels=["Count", "Percentage"],
@@ -226,48 +190,51 @@ def generatePlot(guide, guideDict, motifDict, mismatch, bulge, source):
     table.set_fontsize(fontsize)
     table.scale(1, 1.5)
 
-    totalMotif = [0] * len(guide)
-    for count in range(len(guide)):
-        for nuc in motifDict:
-            totalMotif[count] += motifDict[nuc][count]
-
-    maxmax = max(totalMotif)
-    for count in range(len(guide)):
-        for nuc in motifDict:
-            if maxmax != 0:
-                motifDict[nuc][count] = float(motifDict[nuc][count] / float(maxmax))
+    # per position counts (one row per motif), normalized on the tallest position
+    motif_matrix = np.asarray(
+        [motifDict[nuc] for nuc in ["A", "C", "G", "T", "RNA", "DNA"]], dtype=float
+    )
+    maxmax = motif_matrix.sum(axis=0).max()
+    if maxmax != 0:
+        motif_matrix /= maxmax
 
     # ind = np.arange(0, len(guide), 1) + 0.15
     ind = np.arange(0, len(guide), 1)
     width = 0.7  # the width of the bars: can also be len(x) sequence
 
-    motif = plt.subplot(2, 1, 2, frameon=False)
-
-    A = np.array(motifDict["A"], dtype=float)
-    C = np.array(motifDict["C"], dtype=float)
-    G = np.array(motifDict["G"], dtype=float)
-    T = np.array(motifDict["T"], dtype=float)
-    RNA = np.array(motifDict["RNA"], dtype=float)
-    DNA = np.array(motifDict["DNA"], dtype=float)
-
-    p1 = plt.bar(ind, A, width, align="center")
-    p2 = plt.bar(ind, C, width, bottom=A, align="center")
-    p3 = plt.bar(ind, G, width, bottom=A + C, align="center")
-    p4 = plt.bar(ind, T, width, bottom=C + G + A, align="center")
-    p5 = plt.bar(ind, RNA, width, bottom=C + G + A + T, align="center")
-    p6 = plt.bar(ind, DNA, width, bottom=C + G + A + T + RNA, align="center")
-
-    plt.xticks(ticks=ind, labels=list(guide), size=fontsize)
-    plt.yticks(size=fontsize)
-
-    plt.legend(
-        (p1[0], p2[0], p3[0], p4[0], p5[0], p6[0]),
+    # stacked bars drawn as a single collection of rectangles, one color per motif
+    tops = np.cumsum(motif_matrix, axis=0)
+    bottoms = np.vstack([np.zeros_like(ind, dtype=float), tops[:-1]])
+    left = np.broadcast_to(ind - width / 2, tops.shape)
+    right = left + width
+    verts = np.stack(
+        [
+            np.stack([left, bottoms], axis=-1),
+            np.stack([left, tops], axis=-1),
+            np.stack([right, tops], axis=-1),
+            np.stack([right, bottoms], axis=-1),
+        ],
+        axis=2,
+    ).reshape(-1, 4, 2)
+    colors = plt.rcParams["axes.prop_cycle"].by_key()["color"][:6]
+    bars = PolyCollection(verts, facecolors=[color for color in colors for _ in ind])
+    bars.sticky_edges.y.append(0)
+    motif.add_collection(bars)
+    motif.autoscale_view()
+
+    motif.set_xticks(ind)
+    motif.set_xticklabels(list(guide), size=fontsize)
+    for label in motif.get_yticklabels():
+        label.set_size(fontsize)
+
+    motif.legend(
+        [mpatches.Patch(facecolor=color) for color in colors],
         ("A", "C", "G", "T", "bRNA", "bDNA"),
         fontsize=fontsize,
         loc="upper left",
         ncol=6,
     )
-    plt.title(
+    motif.set_title(
         "Mismatch and bulge distribution for targets with up to "
         + str(total)
         + " mismatches and/or bulges",
@@ -275,7 +242,7 @@ def generatePlot(guide, guideDict, motifDict, mismatch, bulge, source):
         size=titlesize,
     )
 
-    plt.suptitle(
+    fig.suptitle(
         "Targets with up to "
         + str(total)
         + " mismatches and/or bulges by ENCODE/GENCODE annotations",
@@ -284,9 +251,7 @@ def generatePlot(guide, guideDict, motifDict, mismatch, bulge, source):
         size=titlesize,
     )
 
-    plt.tight_layout()
-
-    plt.savefig(
+    fig.savefig(
         outDir
         + "/summary_single_guide_"
         + str(guide)
@@ -301,12 +266,16 @@ def generatePlot(guide, guideDict, motifDict, mismatch, bulge, source):
         format=file_extension,
     )
 
-    plt.close("all")
+    plt.close(fig)
 
 
 guide = guide.strip()
-guideDict = json.load(guideDictFile)
-motifDict = json.load(motifDictFile)
+if orjson is None:
+    guideDict = json.load(guideDictFile)
+    motifDict = json.load(motifDictFile)
+else:
+    guideDict = orjson.loads(guideDictFile.read())
+    motifDict = orjson.loads(motifDictFile.read())
 if __name__ == "__main__":
     total = mismatch + bulge
     total = str(total)
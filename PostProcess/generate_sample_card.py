@@ -6,6 +6,12 @@ import sqlite3
 import pandas as pd
 import os
 
+try:
+    # Arrow columnar fetch, the sample targets of a guide can be many rows
+    import adbc_driver_sqlite.dbapi as adbc
+except ImportError:
+    adbc = None
+
 GUIDE_COLUMN = "Spacer+PAM"
 CHR_COLUMN = "Chromosome"
 POS_COLUMN = "Start_coordinate_(highest_CFD)"
@@ -54,23 +60,33 @@ script_path = sys.argv[4]
 path_db = glob.glob(current_working_directory + "/.*.db")[0]
 # print('leggo il nome db')
 path_db = str(path_db)
-conn = sqlite3.connect(path_db)
-c = conn.cursor()
 # print('connesso to db')
 # extract personal targets
-result_personal = pd.read_sql_query(
-    "SELECT * FROM final_table WHERE \"{}\"='{}' AND \"{}\" LIKE '%{}%'".format(
-        GUIDE_COLUMN, guide, SAMPLES_COLUMN, sample
-    ),
-    conn,
+query = 'SELECT * FROM final_table WHERE "{}"=? AND "{}" LIKE ?'.format(
+    GUIDE_COLUMN, SAMPLES_COLUMN
 )
+params = [guide, f"%{sample}%"]
+result_personal = None
+if adbc is not None:
+    with adbc.connect(path_db) as conn:
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        try:
+            result_personal = cursor.fetch_arrow_table().to_pandas()
+        except OSError:
+            # column types are inferred from the first rows, mixed type
+            # columns (e.g. NA in numeric ones) need the row by row reader
+            pass
+        cursor.close()
+if result_personal is None:
+    conn = sqlite3.connect(path_db)
+    result_personal = pd.read_sql_query(query, conn, params=params)
+    conn.close()
 result_personal = result_personal.sort_values(
     [CFD_COLUMN, TOTAL_COLUMN], ascending=[False, True]
 )
 # filter private targets
 result_private = result_personal[result_personal[SAMPLES_COLUMN] == sample]
-conn.commit()
-conn.close()
 # print('fatto queries')
 # save to file
 result_personal.to_csv(integrated_personal, sep="\t", index=False)
@@ -17,10 +17,78 @@ import dash_html_components as html
 import dash_bootstrap_components as dbc
 import dash_table
 import pandas as pd
+from collections import OrderedDict
 import sqlite3
+import threading
+import os
 
 guide_column = "Spacer+PAM"
 
+# open connections to the results databases, reused across queries; the least
+# recently used one is dropped when more than MAX_CONNECTIONS are open.
+# Connections are shared by the callback threads, so a dropped connection is
+# never closed here: sqlite3 closes it once the last thread using it releases it
+MAX_CONNECTIONS = 8
+_CONN_CACHE = OrderedDict()  # path -> (inode, connection)
+_CONN_LOCK = threading.Lock()
+
+
+def get_connection(path):
+    with _CONN_LOCK:
+        cached = _CONN_CACHE.pop(path, None)
+        # a deleted database leaves the cache (stat raises), a database rebuilt
+        # in place gets a new connection
+        inode = os.stat(path).st_ino
+        if cached is not None and cached[0] != inode:
+            cached = None
+        if cached is None:
+            conn = sqlite3.connect(path, check_same_thread=False)
+            # read only traffic: memory map the file and keep index pages cached;
+            # at most 16 MB of page cache per connection (128 MB for all of them)
+            # and 256 MB of mapped file, backed by the shared OS page cache
+            conn.executescript(
+                """
+                PRAGMA query_only=1;
+                PRAGMA cache_size=-16384;
+                PRAGMA mmap_size=268435456;
+                PRAGMA temp_store=MEMORY;
+                """
+            )
+            cached = (inode, conn)
+            while len(_CONN_CACHE) >= MAX_CONNECTIONS:
+                _CONN_CACHE.popitem(last=False)
+        _CONN_CACHE[path] = cached  # most recently used last
+        return cached[1]
+
+
+# SQL text of each ordering, the same string for the same ordering lets sqlite3
+# reuse its prepared statement; only literals are bound as parameters
+_SQL_CACHE = dict()
+
+
+def get_query(radio_order, orderdrop, asc1, threshold):
+    key = (radio_order, orderdrop, asc1, threshold)
+    if key not in _SQL_CACHE:
+        where = f'"{guide_column}"=?'
+        if threshold:
+            where += f' AND "{radio_order}" BETWEEN ? AND ?'
+        order = f'"{radio_order}" {asc1}'
+        if orderdrop is not None:  # ordinamento doppio
+            order += f', "{orderdrop}" {asc1}'
+        _SQL_CACHE[key] = (
+            f"SELECT * FROM final_table WHERE {where} ORDER BY {order} LIMIT ? OFFSET ?"
+        )
+    return _SQL_CACHE[key]
+
+
+def fetch_page(conn, query, params):
+    # pages are small, build the dataframe straight from the fetched rows
+    cursor = conn.execute(query, params)
+    rows = cursor.fetchall()
+    return pd.DataFrame.from_records(
+        rows, columns=[description[0] for description in cursor.description]
+    )
+
 
 def shold(
     target,
@@ -38,15 +106,15 @@ def shold(
 ):
     # query with threshold
     # print('entro shold')
-    if asc1 == None:
+    if asc1 != "ASC":
         asc1 = "DESC"
+    double_order = orderdrop is not None
 
     url = url_job[5:]
 
     path = current_working_directory + "/Results/" + url + "/." + url + ".db"
 
-    conn = sqlite3.connect(path)
-    c = conn.cursor()
+    conn = get_connection(path)
     param = [
         guide,
         page_size,
@@ -72,43 +140,14 @@ def shold(
 
     # print(radio_order, orderdrop)
 
-    if orderdrop != "None_(highest_CFD)":  # ordinamento doppio
-        if maxdrop == None:
-            maxdrop = 1000
-        # if maxdrop == None:  # min
-        #     df = pd.read_sql_query("SELECT * FROM final_table WHERE \"{}\"=? AND {}>={} ORDER BY \"{}\" {},\"{}\" {} LIMIT ? OFFSET ?".format(
-        #         guide_column, radio_order, sholddrop, radio_order, asc1, orderdrop, asc1), conn, params=param)
-        # else:  # min e max
-        df = pd.read_sql_query(
-            'SELECT * FROM final_table WHERE "{}"=? AND "{}" BETWEEN {} AND {} ORDER BY "{}" {},"{}" {}  LIMIT ? OFFSET ?'.format(
-                guide_column,
-                radio_order,
-                sholddrop,
-                maxdrop,
-                radio_order,
-                asc1,
-                orderdrop,
-                asc1,
-            ),
-            conn,
-            params=param,
-        )
-    else:  # ordinamento singolo
-        if maxdrop == None:  # min
-            maxdrop = 1000
-            # df = pd.read_sql_query("SELECT * FROM final_table WHERE \"{}\"=? AND \"{}\">={} ORDER BY \"{}\" {} LIMIT ? OFFSET ?".format(
-            #     guide_column, radio_order, sholddrop, radio_order, asc1), conn, params=param)  # ok
-        # else:  # min e max
-        df = pd.read_sql_query(
-            'SELECT * FROM final_table WHERE "{}"=? AND "{}" BETWEEN {} AND {} ORDER BY "{}" {} LIMIT ? OFFSET ?'.format(
-                guide_column, radio_order, sholddrop, maxdrop, radio_order, asc1
-            ),
-            conn,
-            params=param,
-        )  # ok
-
-    conn.commit()
-    conn.close()
+    if maxdrop == None:
+        maxdrop = 1000
+    df = fetch_page(
+        conn,
+        get_query(radio_order, orderdrop if double_order else None, asc1, True),
+        [guide, sholddrop, maxdrop] + param[1:],
+    )
+
     data = df
     return data
 
@@ -127,13 +166,13 @@ def noshold(
 ):
     # print(asc1)
     # print('entro noshold')
-    if asc1 == None:
+    if asc1 != "ASC":
         asc1 = "DESC"
+    double_order = orderdrop is not None
     url = url_job[5:]
     path = current_working_directory + "/Results/" + url + "/." + url + ".db"
 
-    conn = sqlite3.connect(path)
-    c = conn.cursor()
+    conn = get_connection(path)
     param = [
         guide,
         page_size,
@@ -160,29 +199,12 @@ def noshold(
 
     # print(radio_order, orderdrop)
 
-    if orderdrop != "None_(highest_CFD)":
-        # query con multiordinamento
-        # print('double ordering')
-        df = pd.read_sql_query(
-            'SELECT * FROM final_table WHERE "{}"=? ORDER BY "{}" {}, "{}" {} LIMIT ? OFFSET ?'.format(
-                guide_column, radio_order, asc1, orderdrop, asc1
-            ),
-            conn,
-            params=param,
-        )
-    else:
-        # query con ordinamento singolo
-        # print('single ordering')
-        df = pd.read_sql_query(
-            'SELECT * FROM final_table WHERE "{}"=? ORDER BY "{}" {} LIMIT ? OFFSET ?'.format(
-                guide_column, radio_order, asc1
-            ),
-            conn,
-            params=param,
-        )
+    df = fetch_page(
+        conn,
+        get_query(radio_order, orderdrop if double_order else None, asc1, False),
+        param,
+    )
 
     # query senza soglia
-    conn.commit()
-    conn.close()
     data = df
     return data
@@ -22,6 +22,11 @@ import random
 import multiprocessing
 import json
 
+try:
+    import orjson  # serializes straight to bytes, much faster on large dicts
+except ImportError:  # orjson not available, use the standard json module
+    orjson = None
+
 warnings.filterwarnings("ignore")
 # matplotlib.use("TkAgg")
 matplotlib.use("Agg")
@@ -34,7 +39,7 @@ matplotlib.rcParams["ps.fonttype"] = 42
 random.seed(a=None, version=2)
 # final file containing all the results after post processing
 inGuideFile = open(sys.argv[1], "r")  # guide file used during search
-inFinalFile = open(sys.argv[2], "r")  # final result file from search
+inFinalFileName = sys.argv[2]  # final result file from search
 inSamplesIDFile = open(sys.argv[3], "r").readlines()  # sampleID file
 inSamplesIDFile.pop(0)  # pop header from sampleID file
 # annotation file used during search
@@ -70,6 +75,16 @@ def motifDictCreation(guide):
     return motifDict
 
 
+def dumpDict(dictionary, jsonFile):
+    # write dictionary to JSON, integer keys are stored as strings in both cases
+    if orjson is None:
+        with open(jsonFile, "w") as handle:
+            json.dump(dictionary, handle)
+    else:
+        with open(jsonFile, "wb") as handle:
+            handle.write(orjson.dumps(dictionary, option=orjson.OPT_NON_STR_KEYS))
+
+
 def guideDictCreation(annotationsSet):
     # create one stamp for guideDict
     guideDict = dict()
@@ -83,7 +98,8 @@ def guideDictCreation(annotationsSet):
 
 def fillDict(guide, guideDict, motifDict):
     # fill dictionary with info read from the final file
-    inFinalFile.seek(0)
+    # each guide opens its own handle, guides are processed in parallel
+    inFinalFile = open(inFinalFileName, "r")
     if "#" in inFinalFile.readline():
         print("SKIP HEADER")
     else:
@@ -139,6 +155,19 @@ def fillDict(guide, guideDict, motifDict):
                         motifDict[over][alignedSequence[count].upper()][count] += 1
                     else:
                         break
+    inFinalFile.close()
+
+
+def processGuide(guide):
+    # compute and save the radar chart dictionaries of a single guide
+    guideDict = guideDictCreation(annotationsSet)
+    motifDict = motifDictCreation(guide)
+    fillDict(guide, guideDict, motifDict)
+    # for total in range(max_mm+max_bulges):
+    #     generatePlot(guide, guideDict[total],
+    #                  motifDict[total], total, 0, 'TOTAL')
+    dumpDict(guideDict, outDir + f"/.guide_dict_{guide}_{selection_criteria}.json")
+    dumpDict(motifDict, outDir + f"/.motif_dict_{guide}_{selection_criteria}.json")
 
 
 # data containing populations and annotations
@@ -164,17 +193,10 @@ for line in inSamplesIDFile:
     split = line.strip().split("\t")
     populationDict[split[0]] = [split[2], split[1]]
 
-for guide in inGuideFile:
-    guide = guide.strip()
-    guideDict = guideDictCreation(annotationsSet)
-    motifDict = motifDictCreation(guide)
-    fillDict(guide, guideDict, motifDict)
-    # for total in range(max_mm+max_bulges):
-    #     generatePlot(guide, guideDict[total],
-    #                  motifDict[total], total, 0, 'TOTAL')
-    json.dump(
-        guideDict, open(outDir + f"/.guide_dict_{guide}_{selection_criteria}.json", "w")
-    )
-    json.dump(
-        motifDict, open(outDir + f"/.motif_dict_{guide}_{selection_criteria}.json", "w")
-    )
+if __name__ == "__main__":
+    # guides are independent, each one scans the final file in its own process
+    guides = [guide.strip() for guide in inGuideFile]
+    with multiprocessing.Pool(max(min(threads, len(guides)), 1)) as pool:
+        # consume results as they complete, so errors in workers are raised here
+        for _ in pool.imap_unordered(processGuide, guides, chunksize=1):
+            pass
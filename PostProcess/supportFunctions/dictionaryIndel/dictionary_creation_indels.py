@@ -9,11 +9,12 @@ WARNING! About 20 minutes per vcf file, for a total of 80GB of disk space
 # argv 2 is selected sample
 # argv 3 is directory to save the dictionary
 
-import gzip
 import sys
 import json
 import time
 
+import pysam
+
 vcf_file = sys.argv[1]
 chr_name = vcf_file.split('.')
 for i in chr_name:
@@ -23,63 +24,56 @@ for i in chr_name:
 selected_sample = sys.argv[2]
 save_directory = sys.argv[3]
 
-dictionary_dict = dict()
+#the dictionary is streamed to the JSON file entry by entry, it is never held in memory;
+#a key written twice keeps its last value when loaded, as in a dict
+dictionary_file = open(save_directory + '_' + selected_sample + '/my_dict_' + chr_name + '.json', 'w')
+dictionary_file.write('{')
+separator = ''      #no comma before the first entry
 start_time = time.time()
 add_to_name = ''     #string to add to the chr number, eg in VCF hg38 -> is already chr1, so add_to_name is '';
                         #VCF hg19 -> is 1, so add_to_name is 'chr'
 offset = 0      #Sum this value to the position of the variant ad adjust this value for every indel found
-with gzip.open(sys.argv[1], 'rb') as targets:
-    for line in targets:
-        line = line.decode('ascii')
-        if ('#CHROM') in line:
-            column_vcf = line.strip().split('\t')
-            sample_header_pos = column_vcf.index(selected_sample)
-            break
+#htslib decompresses (on 2 extra threads) and parses the records, only the selected sample genotype is decoded
+with pysam.VariantFile(vcf_file, threads=2) as targets:
+    targets.subset_samples([selected_sample])
+    records = iter(targets)
 
-    first_line = next(targets).decode('ascii').strip().split('\t')
-    if 'chr' not in first_line[0]:
+    first_line = next(records)
+    if 'chr' not in first_line.chrom:
         add_to_name = 'chr'
     list_samples = []
     list_chars = []
-    
-    hap = first_line[sample_header_pos].split('|')
-    for h in hap:   #NOTE posso avere anche 2|1 #TODO da finire
-        if '0' == h:
+
+    for h in first_line.samples[selected_sample]['GT']:   #NOTE posso avere anche 2|1 #TODO da finire
+        if not h or not first_line.alts:   #reference allele, missing call or no ALT allele
             continue
-        variant_of_sample = int(h) - 1      #If in VAR i have TT,TTA,TTT and in sample 0|2, the variant is TTA
+        variant_of_sample = h - 1      #If in VAR i have TT,TTA,TTT and in sample 0|2, the variant is TTA
+        alt = first_line.alts[variant_of_sample]
         list_samples.append(selected_sample)
-        offset = offset + len(line[3]) - len(line[4].split(',')[variant_of_sample])
-        if len(line[3]) != 1 or len(line[4].split(',')[variant_of_sample]) != 1:    #Save only the SNP
+        offset = offset + len(first_line.ref) - len(alt)
+        if len(first_line.ref) != 1 or len(alt) != 1:    #Save only the SNP
             break
-        chr_pos_key = add_to_name + line[0] + ',' + str(offset + int(line[1]))
+        chr_pos_key = add_to_name + first_line.chrom + ',' + str(offset + first_line.pos)
         #Add in last two position the ref and alt nucleotide, eg: chrX,100 -> sample1,sample5,sample10;A,T
         #If no sample was found, the dict is chrX,100 -> ;A,T
-        list_chars.append(line[3])  #REF char
-        list_chars.append(line[4].split(',')[variant_of_sample])  #VAR char
-        try:
-            dictionary_dict[chr_pos_key] = ','.join(list_samples) + ';' + ','.join(list_chars)
-        except:
-            dictionary_dict[chr_pos_key] = ';' + ','.join(list_chars) #None
-    
-    for line in targets:                #Save CHROM [0], POS[1], REF [3], ALT [4], List of Samples [9:]
-        line = line.decode('ascii').strip().split('\t')
-        list_samples = []
-        list_chars = []
-        if ('1' in first_line[sample_header_pos]):
-            list_samples.append(selected_sample)
-        else:           #This variant is not found in the selected sample
+        list_chars.append(first_line.ref)  #REF char
+        list_chars.append(alt)  #VAR char
+        chr_pos_value = f"{','.join(list_samples)};{','.join(list_chars)}"
+        dictionary_file.write(f"{separator}{json.dumps(chr_pos_key)}:{json.dumps(chr_pos_value)}")
+        separator = ','
+
+    for record in records:                #Save CHROM, POS, REF, ALT of the variants of the selected sample
+        if 1 not in record.samples[selected_sample]['GT']:      #This variant is not found in the selected sample
+            continue
+        if not record.alts:     #No ALT allele (e.g. '.'), nothing to save
             continue
-        chr_pos_key = add_to_name + line[0] + ',' + line[1]
         #Add in last two position the ref and alt nucleotide, eg: chrX,100 -> sample1,sample5,sample10;A,T
-        #If no sample was found, the dict is chrX,100 -> ;A,T
-        list_chars.append(line[3])
-        list_chars.append(line[4])
-        try:
-            dictionary_dict[chr_pos_key] = ','.join(list_samples) + ';' + ','.join(list_chars)
-        except:
-            dictionary_dict[chr_pos_key] = ';' + ','.join(list_chars) #None
+        chr_pos_key = f"{add_to_name}{record.chrom},{record.pos}"
+        chr_pos_value = f"{selected_sample};{record.ref},{','.join(record.alts)}"
+        dictionary_file.write(f"{separator}{json.dumps(chr_pos_key)}:{json.dumps(chr_pos_value)}")
+        separator = ','
         #result.write(line[0] + '\t' + line[1] + '\t' + line[3] + '\t' + line[4] + '\t' + ','.join(list_samples) + '\n')
         
-with open(save_directory + '_' + selected_sample + '/my_dict_' + chr_name + '.json', 'w') as f:
-    json.dump(dictionary_dict, f) 
+dictionary_file.write('}')
+dictionary_file.close()
 print('Created ' + 'my_dict_' + chr_name + '.json for sample ' + selected_sample + ' in', time.time() - start_time)
\ No newline at end of file
@@ -9,10 +9,13 @@ represents the sample ID, the second column the associated Population ID,  the t
 sample Gender (if last column is not available, 'n/a' is written). 
 The script returns a dictionary sample_to_pop, pop_to_superpop, superpop_to_pop, pop_to_sample, and the lists
 all_samples, all_pop, all_superpop and list_gender or 
-None * 8 if input file does not exists or is in incorrect format
+None * 8 if input file does not exists or is in incorrect format.
+sampleAssociation returns the same data as a SampleAssociation, whose inverted maps and lists are built on first access.
 '''
 import sys
 import os
+from collections import defaultdict
+from functools import cached_property, lru_cache
 from os.path import isfile, isdir,join      
 
 #argv 1 is input .txt, consisting of 3 columns for sample, population and superpopulation
@@ -28,75 +31,100 @@ def loadSampleAssociation(id_sample_file):
     - ALL POPULATIONS
     - ALL SUPERPOPULATIONS
     - SAMPLE -> GENDER
+    The file is parsed again only when its modification time or size change (see sampleAssociation)
+    '''
+    samples = sampleAssociation(id_sample_file)
+    return samples.sample_to_pop, samples.pop_to_superpop, samples.superpop_to_pop, samples.pop_to_sample, samples.all_samples, samples.all_pop, samples.all_superpop, samples.gender_sample
+
+def sampleAssociation(id_sample_file):
+    '''
+    Cached SampleAssociation of the file: the file is parsed again only when its modification time or size change.
+    The returned association is shared between calls, callers must not modify it
     '''
     if not isfile(id_sample_file):
-        print('Warning! The sample ID file does not exists')
-        print('Exit..')
-        sys.exit() 
-        return None, None
+        return SampleAssociation(id_sample_file)    #Warn and exit
+    stat = os.stat(id_sample_file)
+    return _cachedSampleAssociation(id_sample_file, stat.st_mtime_ns, stat.st_size)
 
-    sample_to_pop = dict()
-    pop_to_superpop = dict() 
-    superpop_to_pop = dict()   #For each superpopulation returns list of population
-    pop_to_sample = dict()      #For each population return list of sample
-    all_samples = set()
-    all_pop= set()
-    all_superpop = set()
-    gender_sample = dict()
-    with open (id_sample_file) as in_file:
-        #Check correct format of file
-        line = next(in_file)
-        if '#' in line:
-            line = next(in_file)    #Skip header
-        
-        line = line.strip().split('\t')
+@lru_cache(maxsize=32)
+def _cachedSampleAssociation(id_sample_file, mtime, size):
+    return SampleAssociation(id_sample_file)
 
-        if len(line) < 3:
-            print('Warning! The input file is not correctly formatted. Please provide a .txt with a column with SAMPLE_ID, POPULATION_ID, SUPERPOPULATION_ID, GENDER (Optional)')
-            print('Exit...')
+class SampleAssociation:
+    '''
+    SAMPLE -> POPULATION -> SUPERPOPULATION association read from a sample ID file, with the SAMPLE -> GENDER map.
+    The inverted maps and the lists of all samples, populations and superpopulations are built on first access
+    '''
+    def __init__(self, id_sample_file):
+        if not isfile(id_sample_file):
+            print('Warning! The sample ID file does not exists')
+            print('Exit..')
             sys.exit()
-            return None, None, None, None, None, None, None, None
-        #Add info of first line
-        sample_to_pop[line[0]] = line[1]
-        pop_to_superpop[line[1]] = line[2]
-        
-        superpop_to_pop[line[2]] = [line[1]]
-        pop_to_sample[line[1]] = line[0]
-
-        all_samples.add(line[0])
-        all_pop.add(line[1])
-        all_superpop.add(line[2])
 
-        try:
-            gender_sample[line[0]] = line[3]
-        except:
-            gender_sample[line[0]] = 'n/a'
+        self.sample_to_pop = dict()
+        self.pop_to_superpop = dict()
+        self.gender_sample = dict()
+        sample_to_pop = self.sample_to_pop
+        pop_to_superpop = self.pop_to_superpop
+        gender_sample = self.gender_sample
+        with open (id_sample_file, buffering=1 << 20) as in_file:     #1MB read buffer, fewer read syscalls
+            #Check correct format of file
+            line = next(in_file)
+            if line.startswith('#'):
+                line = next(in_file)    #Skip header
 
-        for line in in_file:
             line = line.strip().split('\t')
+            n = len(line)
+
+            if n < 3:
+                print('Warning! The input file is not correctly formatted. Please provide a .txt with a column with SAMPLE_ID, POPULATION_ID, SUPERPOPULATION_ID, GENDER (Optional)')
+                print('Exit...')
+                sys.exit()
+            #Add info of first line
             sample_to_pop[line[0]] = line[1]
             pop_to_superpop[line[1]] = line[2]
+            gender_sample[line[0]] = line[3] if n > 3 else 'n/a'
+
+            for line in in_file:
+                line = line.strip().split('\t')
+                sample_id = line[0]
+                pop_id = line[1]
+                sample_to_pop[sample_id] = pop_id
+                pop_to_superpop[pop_id] = line[2]
+                gender_sample[sample_id] = line[3] if len(line) > 3 else 'n/a'    #Gender column is optional
+
+    @cached_property
+    def superpop_to_pop(self):
+        '''
+        For each superpopulation returns the set of its populations
+        '''
+        superpop_to_pop = defaultdict(set)
+        for pop, superpop in self.pop_to_superpop.items():
+            superpop_to_pop[superpop].add(pop)
+        return dict(superpop_to_pop)    #plain dict, an unknown key must still raise KeyError
+
+    @cached_property
+    def pop_to_sample(self):
+        '''
+        For each population returns the set of its samples
+        '''
+        pop_to_sample = defaultdict(set)
+        for sample, pop in self.sample_to_pop.items():
+            pop_to_sample[pop].add(sample)
+        return dict(pop_to_sample)
+
+    #All samples, populations and superpopulations are the keys of the maps, in order of first appearance
+    @cached_property
+    def all_samples(self):
+        return list(self.sample_to_pop)
 
-            try:
-                superpop_to_pop[line[2]].add(line[1])
-            except :
-                superpop_to_pop[line[2]] = set()
-                superpop_to_pop[line[2]].add(line[1])
-            try:
-                pop_to_sample[line[1]].add(line[0])
-            except:
-                pop_to_sample[line[1]] = set()
-                pop_to_sample[line[1]].add(line[0])
-            
-            all_samples.add(line[0])
-            all_pop.add(line[1])
-            all_superpop.add(line[2])
+    @cached_property
+    def all_pop(self):
+        return list(self.pop_to_superpop)
 
-            try:
-                gender_sample[line[0]] = line[3]
-            except:
-                gender_sample[line[0]] = 'n/a'
-    return sample_to_pop, pop_to_superpop, superpop_to_pop, pop_to_sample, list(all_samples), list(all_pop), list(all_superpop), gender_sample
+    @cached_property
+    def all_superpop(self):
+        return list(self.superpop_to_pop)
 
 if __name__ == '__main__':
     loadSampleAssociation(sys.argv[1])
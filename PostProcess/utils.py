@@ -136,8 +136,7 @@ def check_crisprme_directory_tree(basedir: str) -> None:
         raise FileExistsError(f"Unable to locate {basedir}")
     for d in CRISPRME_DIRS:  # create CRISPRme directory tree
         # if directory not found, create it
-        if not os.path.isdir(os.path.join(basedir, d)):
-            os.makedirs(os.path.join(basedir, d))
+        os.makedirs(os.path.join(basedir, d), exist_ok=True)
 
 
 def ftp_download(
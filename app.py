@@ -16,7 +16,7 @@ Attributes:
     DISPLAY_OFFLINE (str): CSS display property for offline mode.
     DISPLAY_ONLINE (str): CSS display property for online mode.
     pool_executor (ProcessPoolExecutor): Executor for running multiple jobs 
-        concurrently.
+        concurrently (2 by default, set CRISPRME_WORKERS to change it).
     CACHE_CONFIG (dict): Configuration settings for caching.
     cache (Cache): Cache instance for the application.
 """
@@ -55,6 +55,35 @@ def start_message() -> None:
     sys.stderr.write(f"GO TO http://{IPADDRESS} TO USE THE WEB APP\n\n")
 
 
+def cache_config() -> dict:
+    """Returns the caching settings for the web application.
+
+    When the REDIS_URL environment variable points to a reachable redis server,
+    cached data is kept in redis, otherwise it is stored in the Cache directory.
+
+    Args:
+        None
+
+    Returns:
+        dict: The Flask-Caching configuration.
+    """
+
+    redis_url = os.environ.get("REDIS_URL")
+    if redis_url:
+        try:
+            import redis
+
+            redis.Redis.from_url(redis_url).ping()  # fail early if unreachable
+            return {"CACHE_TYPE": "redis", "CACHE_REDIS_URL": redis_url}
+        except ImportError:
+            sys.stderr.write("redis not installed, caching on filesystem\n")
+        except redis.exceptions.RedisError:
+            sys.stderr.write(f"Cannot reach {redis_url}, caching on filesystem\n")
+        except ValueError:  # malformed REDIS_URL
+            sys.stderr.write(f"Invalid REDIS_URL {redis_url}, caching on filesystem\n")
+    return {"CACHE_TYPE": "filesystem", "CACHE_DIR": "Cache"}
+
+
 # --> entry point <-- #
 external_stylesheets = [
     "https://codepen.io/chriddyp/pen/bWLwgP.css",
@@ -66,14 +95,13 @@ app = dash.Dash(
     external_stylesheets=external_stylesheets,
     suppress_callback_exceptions=True,
     server=server,
+    compress=True,  # gzip responses (flask-compress)
 )  # initialize server app
 app_directory = os.path.dirname(os.path.realpath(__file__))  # current location
 start_message()  # print server start message
 app.title = "CRISPRme"  # assign flask app name
 # necessary if update element in a callback generated in another callback
 # app.config['suppress_callback_exceptions'] = True
-app.css.config.serve_locally = True
-app.scripts.config.serve_locally = True
 # define filtering operators used when querying tables
 operators = [
     ["ge ", ">="],
@@ -91,13 +119,18 @@ if ONLINE:
     DISPLAY_OFFLINE = "none"
 else:
     DISPLAY_ONLINE = "none"
-# set to execute multiple 2 jobs max at time
-pool_executor = concurrent.futures.ProcessPoolExecutor(max_workers=2)
+# online the dash bundles are fetched from the CDN, offline they are served by the
+# local server (no internet connection required)
+app.css.config.serve_locally = not ONLINE
+app.scripts.config.serve_locally = not ONLINE
+# set to execute 2 jobs max at time, unless CRISPRME_WORKERS asks for more
+# (bounded by the available cores)
+pool_executor = concurrent.futures.ProcessPoolExecutor(
+    max_workers=max(
+        min(int(os.environ.get("CRISPRME_WORKERS", 2)), os.cpu_count() or 1), 1
+    )
+)
 # configure caching
-CACHE_CONFIG = {
-    # try 'filesystem' if you don't want to setup redis
-    "CACHE_TYPE": "filesystem",
-    "CACHE_DIR": ("Cache"),  # os.environ.get('REDIS_URL', 'localhost:6379')
-}
+CACHE_CONFIG = cache_config()  # redis if REDIS_URL is set, filesystem otherwise
 cache = Cache()  # initialize cache
 cache.init_app(app.server, config=CACHE_CONFIG)  # start web-app
@@ -0,0 +1,14 @@
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    crisprme: {
+        // report the REF/VAR target counts for the CFD value under the cursor
+        filter_cfd: function (hoverData) {
+            if (!hoverData || !hoverData.points || !hoverData.points.length) {
+                return '';
+            }
+            const point = hoverData.points[0];
+            const counts = point.customdata || [];
+            return 'CFD=' + point.x + ': ' + counts[0] + ' targets in Reference, ' +
+                counts[1] + ' targets in Enriched';
+        }
+    }
+});
@@ -12,15 +12,15 @@ import re
 version = "2.1.7"  #  CRISPRme version; TODO: update when required
 __version__ = version
 
+# path where this file is located (<prefix>/bin when installed with conda)
 script_path = os.path.dirname(os.path.abspath(__file__))
-origin_path = os.path.dirname(os.path.abspath(__file__))
-# path where this file is located
-# origin_path = os.path.dirname(os.path.realpath(__file__))
+# conda installation prefix
+conda_prefix = os.path.dirname(script_path)
 # conda path
 conda_path = "opt/crisprme/PostProcess/"
 # path corrected to use with conda
-corrected_origin_path = script_path[:-3] + conda_path
-corrected_web_path = f"{origin_path[:-3]}/opt/crisprme/"
+corrected_origin_path = os.path.join(conda_prefix, conda_path)
+corrected_web_path = os.path.join(conda_prefix, "opt/crisprme/")
 # corrected_web_path = os.getcwd()
 
 script_path = corrected_origin_path
@@ -229,8 +229,7 @@ def directoryCheck():
         "samplesIDs",
     ]
     for directory in directoryList:
-        if not os.path.exists(current_working_directory + directory):
-            os.makedirs(current_working_directory + directory)
+        os.makedirs(current_working_directory + directory, exist_ok=True)
 
 
 def complete_search():
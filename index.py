@@ -10,6 +10,9 @@ Attributes:
     HOST (str): The host address for the server.
     PORTWEB (int): The port number for the website.
     PORTLOCAL (int): The port number for the local server.
+    PAGES (dict): The static pages, mapping the url path to the page layout.
+    RESULT_TABS (dict): The results page tabs, mapping the url hash marker to the
+        tab layout.
     server (Flask): The Flask server instance.
     navbar (html.Div): The navigation bar component of the web application.
     app.layout (html.Div): The layout structure of the Dash application.
@@ -49,6 +52,15 @@ CRISPRME_DIRS = [
     "PAMs",
     "samplesIDs",
 ]  # crisprme directory tree
+PAGES = {
+    "/user-guide": help_page.helpPage,  # manual page
+    "/contacts": contacts_page.contact_page,  # contacts page
+    "/history": history_page.history_page,  # results history page
+}  # static pages, keyed by url path
+RESULT_TABS = {
+    "Sample": results_page.sample_page,  # sample tab (#<guide>-Sample-<sample>)
+    "Pos": results_page.cluster_page,  # genomic region tab (#<guide>-Pos-<chr>-<pos>)
+}  # results page tabs, keyed by the marker following the guide in the url hash
 
 
 def check_directories(basedir: str) -> None:
@@ -70,8 +82,7 @@ def check_directories(basedir: str) -> None:
     if not os.path.exists(basedir):
         raise FileNotFoundError(f"Unable to locate {basedir}")
     for d in CRISPRME_DIRS:
-        if not os.path.exists(os.path.join(basedir, d)):
-            os.makedirs(os.path.join(basedir, d))
+        os.makedirs(os.path.join(basedir, d), exist_ok=True)
 
 
 # initialize the webpage
@@ -128,33 +139,20 @@ def change_page(href: str, path: str, search: str, hash_guide: str) -> Tuple:
         # if online show the webaddress, show the ip address otherwise
         job_loading_url = WEBADDRESS if ONLINE else IPADDRESS
         return (load_page.load_page(), f"{job_loading_url}/load{search}")
+    job_link = os.path.join(URL, "load", search)
     if path == "/result":  # display results page
         job_id = search.split("=")[-1]  # recover job id from url
-        if not hash_guide or hash_guide is None:
-            return results_page.result_page(job_id), os.path.join(URL, "load", search)
-        elif "new" in hash_guide:  # targets table tab
-            return (
-                results_page.guidePagev3(job_id, hash_guide.split("#")[1]),
-                os.path.join(URL, "load", search),
-            )
-        elif "-Sample-" in hash_guide:  # sample tab
-            return (
-                results_page.sample_page(job_id, hash_guide.split("#")[1]),
-                os.path.join(URL, "load", search),
-            )
-        elif "-Pos-" in hash_guide:  # genomic region tab
-            return (
-                results_page.cluster_page(job_id, hash_guide.split("#")[1]),
-                os.path.join(URL, "load", search),
-            )
-        return results_page.result_page(job_id), os.path.join(URL, "load", search)
-
-    if path == "/user-guide":  # display manual page
-        return help_page.helpPage(), os.path.join(URL, "load", search)
-    if path == "/contacts":  # display contacts page
-        return contacts_page.contact_page(), os.path.join(URL, "load", search)
-    if path == "/history":  # display results history page
-        return history_page.history_page(), os.path.join(URL, "load", search)
+        if hash_guide:
+            hash_term = hash_guide.split("#")[1]
+            fields = hash_term.split("-", 2)  # guides never contain dashes
+            if len(fields) == 3 and fields[1] in RESULT_TABS:
+                return RESULT_TABS[fields[1]](job_id, hash_term), job_link
+            if len(fields) == 1 and "new" in hash_term:  # targets table tab
+                return results_page.guidePagev3(job_id, hash_term), job_link
+        return results_page.result_page(job_id), job_link
+    page = PAGES.get(path)
+    if page is not None:  # display static page
+        return page(), job_link
     return main_page.index_page(), "/index"  # display main page
 
 
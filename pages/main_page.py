@@ -7,6 +7,7 @@ from .pages_utils import (
     ANNOTATIONS_DIR,
     DNA_ALPHABET,
     EMAIL_FILE,
+    FINGERPRINT_FILE,
     GENOMES_DIR,
     GITHUB_LINK,
     GUIDES_FILE,
@@ -43,16 +44,17 @@ from app import (
 
 from dash.exceptions import PreventUpdate
 from dash.dependencies import Input, Output, State
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
+from functools import lru_cache
 
 import dash_bootstrap_components as dbc
 import dash_html_components as html
 import dash_core_components as dcc
 
-import collections
 import subprocess
-import filecmp
+import hashlib
+import shutil
 import random
 import string
 import os
@@ -60,12 +62,27 @@ import os
 
 MAX_BULGES = 3  # max allowed bulges
 MAX_MMS = 7  # max allowed mismatches
-# mismatches, bulges and guides values
-AV_MISMATCHES = [{"label": i, "value": i} for i in range(MAX_MMS)]
-AV_BULGES = [{"label": i, "value": i} for i in range(MAX_BULGES)]
-AV_GUIDE_SEQUENCE = [{"label": i, "value": i} for i in range(15, 26)]
+# mismatches, bulges and guides values (read-only, shared by every page load)
+AV_MISMATCHES = tuple({"label": i, "value": i} for i in range(MAX_MMS))
+AV_BULGES = tuple({"label": i, "value": i} for i in range(MAX_BULGES))
+AV_GUIDE_SEQUENCE = tuple({"label": i, "value": i} for i in range(15, 26))
 # base editing options
-BE_NTS = [{"label": nt, "value": nt} for nt in DNA_ALPHABET]
+BE_NTS = tuple({"label": nt, "value": nt} for nt in DNA_ALPHABET)
+# example run parameters
+EXAMPLE_DATA = (
+    "CTAACAGTTGCTTTTATCAC",  # guide to use
+    "SpCas9",  # Cas protein to use
+    "20bp-NGG-SpCas9",  # Editor to use
+    "hg38",  # ref genome to use
+    ("1000G",),  # VCF to use
+    "6",  # MM
+    "2",  # DNA bulges
+    "2",  # RNA bulges
+    "4",  # start window in base editor
+    "8",  # stop window in base editor
+    "A",  # nt to check in base editor
+    "Y",  # base editor radio button to yes
+)
 
 
 def split_filter_part(filter_part: str) -> Tuple:
@@ -139,20 +156,143 @@ def load_example_data(load_button_click: int) -> List[str]:
         Example parameters
     """
 
-    return [
-        "CTAACAGTTGCTTTTATCAC",  # guide to use
-        "SpCas9",  # Cas protein to use
-        "20bp-NGG-SpCas9",  # Editor to use
-        "hg38",  # ref genome to use
-        ["1000G"],  # VCF to use
-        "6",  # MM
-        "2",  # DNA bulges
-        "2",  # RNA bulges
-        "4",  # start window in base editor
-        "8",  # stop window in base editor
-        "A",  # nt to check in base editor
-        "Y",  # base editor radio button to yes
+    return list(EXAMPLE_DATA)  # dash expects a list for multiple outputs
+
+
+def personalize_annotation(
+    annotation_fname: str, personal_annotation_fname: str
+) -> None:
+    """Write a copy of the input annotation BED with "_personal" appended to
+    each annotation name (4th column).
+
+    ...
+
+    As awk '$4 = $4"_personal"', the fields are split on blanks and joined back
+    with single spaces.
+
+    Parameters
+    ----------
+    annotation_fname : str
+        Input annotation BED
+    personal_annotation_fname : str
+        Output annotation BED
+
+    Returns
+    -------
+    None
+    """
+
+    with open(annotation_fname) as infile, open(
+        personal_annotation_fname, mode="w"
+    ) as outfile:
+        for line in infile:
+            fields = line.split()
+            fields += [""] * (4 - len(fields))  # add the annotation field if missing
+            fields[3] += "_personal"
+            outfile.write(" ".join(fields) + "\n")
+
+
+@lru_cache(maxsize=256)
+def prepare_guides(
+    text_guides: str, guide_seqlen: int, pam_len: int, pam_begin: bool
+) -> str:
+    """Clean the input guides and pad them with Ns in place of the PAM.
+
+    The guides are made upper case, only those as long as the PAM guide length
+    are kept (up to 100 per run), and forbidden characters are removed. The
+    result depends only on the input values, so repeated submissions of the
+    same guides reuse it.
+
+    Parameters
+    ----------
+    text_guides : str
+        Input guides (one per line)
+    guide_seqlen : int
+        Guide length
+    pam_len : int
+        PAM length
+    pam_begin : bool
+        PAM at the beginning of the guide
+
+    Returns
+    -------
+    str
+        Guides ready to be written in the guides file (empty if no guide
+        survived the cleaning)
+    """
+
+    # force guides to be upper case (guides are split once and filtered as a list)
+    guides = [
+        guide
+        for guide in text_guides.upper().split("\n")
+        if len(guide) == guide_seqlen
     ]
+    if not guides:  # no suitable guide found
+        guides.append("A" * guide_seqlen)
+    # set limit to 100 guides per run in the website
+    text_guides = "\n".join(guides[:100])
+    # remove forbidden characters from guides (single pass with a deletion table)
+    forbidden_chars = "".join(set(text_guides) - VALID_CHARS - {"\n"})
+    text_guides = text_guides.translate(str.maketrans("", "", forbidden_chars))
+    if not text_guides:
+        return text_guides
+    # Adjust guides by adding Ns (compatible with Crispritz)
+    if pam_begin:
+        return "N" * pam_len + text_guides.replace("\n", "\n" + "N" * pam_len)
+    return text_guides.replace("\n", "N" * pam_len + "\n") + "N" * pam_len
+
+
+def job_fingerprint(
+    job_dir: str, params: Optional[str] = None, guides: Optional[str] = None
+) -> Optional[str]:
+    """Return the fingerprint of the search run in the input job directory.
+
+    The fingerprint is the SHA-256 of the run parameters file and of the sorted
+    guides, hence two jobs share it only if they have the same parameters and
+    the same guides (in any order). It is stored in the job directory and
+    computed again only if missing, or if the content of the parameters and
+    guides files is given (new job). Jobs without parameters or guides files
+    (e.g. all input guides were discarded) have no fingerprint and match no
+    other job.
+
+    Parameters
+    ----------
+    job_dir : str
+        Job directory
+    params : str
+        Content of the run parameters file
+    guides : str
+        Content of the guides file
+
+    Returns
+    -------
+    Optional[str]
+        Job fingerprint (hexadecimal digest), None if the job has no
+        parameters or guides
+    """
+
+    fingerprint_fname = os.path.join(job_dir, FINGERPRINT_FILE)
+    if params is None or guides is None:
+        if os.path.isfile(fingerprint_fname):
+            with open(fingerprint_fname) as handle_fingerprint:
+                return handle_fingerprint.read().strip()
+        try:
+            with open(os.path.join(job_dir, PARAMS_FILE)) as handle_params:
+                params = handle_params.read()
+            with open(os.path.join(job_dir, GUIDES_FILE)) as handle_guides:
+                guides = handle_guides.read()
+        except FileNotFoundError:
+            return None
+    if not guides:  # the guides file is not written without guides
+        return None
+    params = params.encode()
+    fingerprint = hashlib.sha256()
+    fingerprint.update(b"%d\n" % len(params))  # mark where parameters end
+    fingerprint.update(params)
+    fingerprint.update("\n".join(sorted(guides.split("\n"))).encode())
+    with open(fingerprint_fname, mode="w") as handle_fingerprint:
+        handle_fingerprint.write(fingerprint.hexdigest())
+    return fingerprint.hexdigest()
 
 
 # Job submission and results URL definition
@@ -277,44 +417,54 @@ def change_url(
         URL to retrieve CRISPRme analysis results
     """
 
-    if n is not None:
-        if not isinstance(n, int):
-            raise TypeError(f"Expected {int.__name__}, got {type(n).__name__}")
-    if not isinstance(href, str):
-        raise TypeError(f"Expected {str.__name__}, got {type(href).__name__}")
-    if nuclease is not None:
-        if not isinstance(nuclease, str):
-            raise TypeError(f"Expected {str.__name__}, got {type(nuclease).__name__}")
-    if genome_selected is not None:
-        if not isinstance(genome_selected, str):
-            raise TypeError(
-                f"Expected {str.__name__}, got {type(genome_selected).__name__}"
-            )
-    if not isinstance(ref_var, list):
-        raise TypeError(f"Expected {list.__name__}, got {type(ref_var).__name__}")
-    if pam is not None:
-        if not isinstance(pam, str):
-            raise TypeError(f"Exepcted {str.__name__}, got {type(pam).__name__}")
-    if text_guides is not None:
-        if not isinstance(text_guides, str):
-            raise TypeError(
-                f"Expected {str.__name__}, got {type(text_guides).__name__}"
-            )
-    # if rna is not None:
-    #     if not isinstance(rna, int):
-    #         raise TypeError(f"Expected {str.__name__}, got {type(rna).__name__}")
-    # if dna is not None:
-    #     if not isinstance(dna, int):
-    #         raise TypeError(f"Expected {str.__name__}, got {type(dna).__name__}")
-    if adv_opts is not None:
-        if not isinstance(adv_opts, list):
-            raise TypeError(f"Expected {list.__name__}, got {type(adv_opts).__name__}")
-    if dest_email is not None:
-        if not isinstance(dest_email, str):
-            raise TypeError(f"Expected {str.__name__}, got {type(dest_email).__name__}")
-    if job_name is not None:
-        if not isinstance(job_name, str):
-            raise TypeError(f"Expected {str.__name__}, got {type(job_name).__name__}")
+    # type checks are stripped under python -O
+    if __debug__:
+        if n is not None:
+            if not isinstance(n, int):
+                raise TypeError(f"Expected {int.__name__}, got {type(n).__name__}")
+        if not isinstance(href, str):
+            raise TypeError(f"Expected {str.__name__}, got {type(href).__name__}")
+        if nuclease is not None:
+            if not isinstance(nuclease, str):
+                raise TypeError(
+                    f"Expected {str.__name__}, got {type(nuclease).__name__}"
+                )
+        if genome_selected is not None:
+            if not isinstance(genome_selected, str):
+                raise TypeError(
+                    f"Expected {str.__name__}, got {type(genome_selected).__name__}"
+                )
+        if not isinstance(ref_var, list):
+            raise TypeError(f"Expected {list.__name__}, got {type(ref_var).__name__}")
+        if pam is not None:
+            if not isinstance(pam, str):
+                raise TypeError(f"Exepcted {str.__name__}, got {type(pam).__name__}")
+        if text_guides is not None:
+            if not isinstance(text_guides, str):
+                raise TypeError(
+                    f"Expected {str.__name__}, got {type(text_guides).__name__}"
+                )
+        # if rna is not None:
+        #     if not isinstance(rna, int):
+        #         raise TypeError(f"Expected {str.__name__}, got {type(rna).__name__}")
+        # if dna is not None:
+        #     if not isinstance(dna, int):
+        #         raise TypeError(f"Expected {str.__name__}, got {type(dna).__name__}")
+        if adv_opts is not None:
+            if not isinstance(adv_opts, list):
+                raise TypeError(
+                    f"Expected {list.__name__}, got {type(adv_opts).__name__}"
+                )
+        if dest_email is not None:
+            if not isinstance(dest_email, str):
+                raise TypeError(
+                    f"Expected {str.__name__}, got {type(dest_email).__name__}"
+                )
+        if job_name is not None:
+            if not isinstance(job_name, str):
+                raise TypeError(
+                    f"Expected {str.__name__}, got {type(job_name).__name__}"
+                )
     if n is None:
         raise PreventUpdate  # do not update the page
     # job start
@@ -333,30 +483,23 @@ def change_url(
         text_guides = "A" * guide_seqlen
     elif guide_type != "GS":
         text_guides = text_guides.strip()
-        if not all(
-            [
-                len(guide) == len(text_guides.split("\n")[0])
-                for guide in text_guides.split("\n")
-            ]
-        ):
+        guides = text_guides.split("\n")
+        if any(len(guide) != len(guides[0]) for guide in guides):
             text_guides = select_same_len_guides(text_guides)
     # remove Ns from guides
-    guides_tmp = "\n".join(
-        [guide.replace("N", "") for guide in text_guides.split("\n")]
-    )
-    text_guides = guides_tmp.strip()
+    text_guides = text_guides.replace("N", "").strip()
     # ---- Generate random job ids
     id_len = 10
+    results_base = os.path.join(current_working_directory, RESULTS_DIR)
+    # get already assigned job ids (scanned once, entries cache their file type)
+    with os.scandir(results_base) as entries:
+        assigned_ids = {
+            entry.name
+            for entry in entries
+            # avoid hidden files/directories
+            if entry.is_dir() and not entry.name.startswith(".")
+        }
     for i in range(JOBID_ITERATIONS_MAX):
-        # get already assigned job ids
-        assigned_ids = [
-            d
-            for d in os.listdir(os.path.join(current_working_directory, RESULTS_DIR))
-            if (
-                os.path.isdir(os.path.join(current_working_directory, RESULTS_DIR, d))
-                and not d.startswith(".")  # avoid hidden files/directories
-            )
-        ]
         job_id = "".join(
             random.choices(string.ascii_uppercase + string.digits, k=id_len)
         )
@@ -370,21 +513,16 @@ def change_url(
     if job_name and job_name != "None":
         assert isinstance(job_name, str)
         job_id = f"{job_name}_{job_id}"
-    result_dir = os.path.join(current_working_directory, RESULTS_DIR, job_id)
+    result_dir = os.path.join(results_base, job_id)
     # create results directory
-    cmd = f"mkdir {result_dir}"
-    code = subprocess.call(cmd, shell=True)
-    if code != 0:
-        raise ValueError(f"An error occurred while running {cmd}")
+    os.mkdir(result_dir)
     # NOTE test command for queue
-    cmd = f"touch {os.path.join(current_working_directory, RESULTS_DIR, job_id, QUEUE_FILE)}"
-    code = subprocess.call(cmd, shell=True)
-    if code != 0:
-        raise ValueError(f"An error occurred while running {cmd}")
+    open(os.path.join(result_dir, QUEUE_FILE), mode="a").close()
     # ---- Set search parameters
     # ANNOTATION CHECK
     gencode_name = "gencode.protein_coding.bed"
     annotation_name = ".dummy.bed"  # to proceed without annotation file
+    annotation_dir = os.path.join(current_working_directory, ANNOTATIONS_DIR)
     if "EN" in annotation_var:
         annotation_name = "dhs+encode+gencode.hg38.bed"  # use dhs annotation file
         if "MA" in annotation_var:
@@ -395,47 +533,34 @@ def change_url(
                     ".bed",
                 ]
             )
-            annotation_dir = os.path.join(current_working_directory, ANNOTATIONS_DIR)
             annotation_tmp = os.path.join(annotation_dir, f"ann_tmp_{job_id}.bed")
-            cmd = f"cp {os.path.join(annotation_dir, annotation_name)} {annotation_tmp}"
-            code = subprocess.call(cmd, shell=True)
-            if code != 0:
-                raise ValueError(f"An error occurred while running {cmd}")
+            shutil.copyfile(
+                os.path.join(annotation_dir, annotation_name), annotation_tmp
+            )
             annotation_input_tmp = (
                 f"{os.path.join(annotation_dir, annotation_input)}.tmp"
             )
-            cmd = f"awk '$4 = $4\"_personal\"' {os.path.join(annotation_dir, annotation_input)} > {annotation_input_tmp}"
-            code = subprocess.call(cmd, shell=True)
-            if code != 0:
-                raise ValueError(f"An error occurred while running {cmd}")
-            cmd = f"mv {annotation_input_tmp} {os.path.join(annotation_dir, annotation_input)}"
-            code = subprocess.call(cmd, shell=True)
-            if code != 0:
-                raise ValueError(f"An error occurred while running {cmd}")
-            cmd = f"tail -n +1 {os.path.join(annotation_dir, annotation_input)} >> {annotation_tmp}"
-            code = subprocess.call(cmd, shell=True)
-            if code != 0:
-                raise ValueError(f"An error occurred while running {cmd}")
-            cmd = f"mv {annotation_tmp} {os.path.join(annotation_dir, annotation_name)}"
-            code = subprocess.call(cmd, shell=True)
-            if code != 0:
-                raise ValueError(f"An error occurred while running {cmd}")
+            personalize_annotation(
+                os.path.join(annotation_dir, annotation_input), annotation_input_tmp
+            )
+            os.replace(
+                annotation_input_tmp, os.path.join(annotation_dir, annotation_input)
+            )
+            # append the personal annotations to the default ones
+            with open(
+                os.path.join(annotation_dir, annotation_input), mode="rb"
+            ) as infile, open(annotation_tmp, mode="ab") as outfile:
+                shutil.copyfileobj(infile, outfile)
+            os.replace(annotation_tmp, os.path.join(annotation_dir, annotation_name))
     elif "MA" in annotation_var:
         annotation_input_tmp = f"{os.path.join(annotation_dir, annotation_input)}.tmp"
-        cmd = f"awk '$4 = $4\"_personal\"' {os.path.join(annotation_dir, annotation_input)} > {annotation_input_tmp}"
-        code = subprocess.call(cmd, shell=True)
-        if code != 0:
-            raise ValueError(f"an error occurred while running {cmd}")
+        personalize_annotation(
+            os.path.join(annotation_dir, annotation_input), annotation_input_tmp
+        )
         annotation_name = f"{annotation_input}.tmp"
     if "EN" not in annotation_var:
-        cmd = f"rm -rf {os.path.join(annotation_dir, '.dummy.bed')}"
-        code = subprocess.call(cmd, shell=True)
-        if code != 0:
-            raise ValueError(f"An error occurred while running {cmd}")
-        cmd = f"touch {os.path.join(annotation_dir, '.dummy.bed')}"
-        code = subprocess.call(cmd, shell=True)
-        if code != 0:
-            raise ValueError(f"An error occurred while running {cmd}")
+        # empty annotation file (truncated if already present)
+        open(os.path.join(annotation_dir, ".dummy.bed"), mode="w").close()
         gencode_name = ".dummy.bed"
     # GENOME TYPE CHECK
     ref_comparison = False
@@ -477,8 +602,7 @@ def change_url(
         with open(
             os.path.join(result_dir, ".samplesID.txt"), mode="w"
         ) as handle_samples:
-            for e in sample_list:
-                handle_samples.write(f"{e}\n")
+            handle_samples.write("".join(f"{e}\n" for e in sample_list))
     except OSError as e:
         raise e
     # manage email sending
@@ -555,22 +679,7 @@ def change_url(
             guides = "A" * guide_seqlen
         text_guides = "\n".join(guides).strip()
         assert bool(guides)
-    # force guides to be upper case
-    text_guides = text_guides.upper()
-    text_guides_tmp = [
-        guide for guide in text_guides.split("\n") if len(guide) == guide_seqlen
-    ]
-    if not text_guides_tmp:  # no suitable guide found
-        text_guides_tmp.append("A" * guide_seqlen)
-    text_guides = "\n".join(text_guides_tmp)
-    for guide in text_guides.split("\n"):
-        for nt in guide:
-            if nt not in VALID_CHARS:
-                # remove forbidden characters from guide
-                text_guides = text_guides.replace(nt, "")
-    # set limit to 100 guides per run in the website
-    if len(text_guides.split("\n")) > 100:
-        text_guides = "\n".join(text_guides.split("\n")[:100]).strip()
+    text_guides = prepare_guides(text_guides, guide_seqlen, pam_len, pam_begin)
     # Adjust guides by adding Ns (compatible with Crispritz)
     if pam_begin:
         pam_to_file = pam_char + ("N" * guide_seqlen) + " " + index_pam_value
@@ -589,14 +698,6 @@ def change_url(
     if text_guides:
         try:
             with open(guides_file, mode="w") as handle_guides:
-                if pam_begin:
-                    text_guides = "N" * pam_len + text_guides.replace(
-                        "\n", "\n" + "N" * pam_len
-                    )
-                else:
-                    text_guides = (
-                        text_guides.replace("\n", "N" * pam_len + "\n") + "N" * pam_len
-                    )
                 handle_guides.write(text_guides)
         except OSError as e:
             raise e
@@ -644,176 +745,163 @@ def change_url(
     genome_idx = ",".join(genome_idx_list)
     # Create .Params.txt file
     try:
+        params = [
+            ("Genome_selected", genome_selected),
+            ("Genome_ref", genome_ref),
+            ("Genome_idx", genome_idx if search_index else None),
+            ("Pam", pam_char),
+            ("Max_bulges", max_bulges),
+            ("Mismatches", mms),
+            ("DNA", dna),
+            ("RNA", rna),
+            ("Annotation", annotation_name),
+            ("Nuclease", nuclease),
+            ("Ref_comp", ref_comparison),
+            ("BE_nucleotide", be_nt),
+            ("BE_start", be_start),
+            ("BE_stop", be_stop),
+        ]
+        params = "".join(f"{key}\t{value}\n" for key, value in params)
+        # the whole file is written at once
         with open(os.path.join(result_dir, PARAMS_FILE), mode="w") as handle_params:
-            handle_params.write(f"Genome_selected\t{genome_selected}\n")
-            handle_params.write(f"Genome_ref\t{genome_ref}\n")
-            if search_index:
-                handle_params.write(f"Genome_idx\t{genome_idx}\n")
-            else:
-                handle_params.write(f"Genome_idx\tNone\n")
-            handle_params.write(f"Pam\t{pam_char}\n")
-            handle_params.write(f"Max_bulges\t{max_bulges}\n")
-            handle_params.write(f"Mismatches\t{mms}\n")
-            handle_params.write(f"DNA\t{dna}\n")
-            handle_params.write(f"RNA\t{rna}\n")
-            handle_params.write(f"Annotation\t{annotation_name}\n")
-            handle_params.write(f"Nuclease\t{nuclease}\n")
-            handle_params.write(f"Ref_comp\t{ref_comparison}\n")
-            handle_params.write(f"BE_nucleotide\t{be_nt}\n")
-            handle_params.write(f"BE_start\t{be_start}\n")
-            handle_params.write(f"BE_stop\t{be_stop}\n")
+            handle_params.write(params)
     except OSError as e:
         raise e
     # ---- Check if input parameters (mms, bulges, pam, guides, genome) match
-    # those of previous searches
-    computed_results_dirs = [
-        d
-        for d in os.listdir(os.path.join(current_working_directory, RESULTS_DIR))
-        if (
-            os.path.isdir(os.path.join(current_working_directory, RESULTS_DIR, d))
-            and not d.startswith(".")  # ignore hidden directories
-        )
-    ]
-    computed_results_dirs.remove(job_id)  # remove current job results
+    # those of previous searches (same fingerprint)
+    try:
+        # hash the files content just written rather than reading them back
+        fingerprint = job_fingerprint(result_dir, params, text_guides)
+    except OSError as e:
+        raise e
+    # results directories already assigned before the current job was created
+    computed_results_dirs = assigned_ids
     for res_dir in computed_results_dirs:
-        if os.path.exists(
-            os.path.join(current_working_directory, RESULTS_DIR, res_dir, PARAMS_FILE)
-        ):
-            if filecmp.cmp(
-                os.path.join(
-                    current_working_directory, RESULTS_DIR, res_dir, PARAMS_FILE
-                ),
-                os.path.join(result_dir, PARAMS_FILE),
-            ):
-                try:
-                    # old job guides
-                    guides_old = (
-                        open(
-                            os.path.join(
-                                current_working_directory,
-                                RESULTS_DIR,
-                                res_dir,
-                                GUIDES_FILE,
-                            )
-                        )
-                        .read()
-                        .split("\n")
-                    )
-                    # current job guides
-                    guides_current = (
-                        open(
-                            os.path.join(
-                                current_working_directory,
-                                RESULTS_DIR,
-                                job_id,
-                                GUIDES_FILE,
-                            )
-                        )
-                        .read()
-                        .split("\n")
-                    )
-                except OSError as e:
-                    raise e
-                if collections.Counter(guides_old) == collections.Counter(
-                    guides_current
-                ):
-                    if os.path.exists(
-                        os.path.join(
-                            current_working_directory, RESULTS_DIR, res_dir, LOG_FILE
-                        )
-                    ):  # log file found
-                        adj_date = False
+        old_result_dir = os.path.join(results_base, res_dir)
+        if os.path.exists(os.path.join(old_result_dir, PARAMS_FILE)):
+            try:
+                fingerprint_old = job_fingerprint(old_result_dir)
+            except OSError as e:
+                raise e
+            if fingerprint_old is not None and fingerprint_old == fingerprint:
+                if os.path.exists(
+                    os.path.join(old_result_dir, LOG_FILE)
+                ):  # log file found
+                    adj_date = False
+                    try:
+                        with open(os.path.join(old_result_dir, LOG_FILE)) as handle_log:
+                            log_data = handle_log.read().strip()
+                            if "Job\tDone" in log_data:
+                                adj_date = True
+                                log_data = log_data.split("\n")
+                                # same format as the output of echo $(date)
+                                date_new = " ".join(
+                                    datetime.now()
+                                    .astimezone()
+                                    .strftime("%a %b %e %H:%M:%S %Z %Y")
+                                    .split()
+                                )
+                                log_to_write = "\n".join(log_data[:-1])
+                                date_write = str(
+                                    f"{log_to_write}\nJob\nDone\t{date_new}"
+                                )
+                    except OSError as e:
+                        raise e
+                    if adj_date:
                         try:
                             with open(
-                                os.path.join(
-                                    current_working_directory,
-                                    RESULTS_DIR,
-                                    res_dir,
-                                    LOG_FILE,
-                                )
+                                os.path.join(old_result_dir, LOG_FILE),
+                                mode="w+",
                             ) as handle_log:
-                                log_data = handle_log.read().strip()
-                                if "Job\tDone" in log_data:
-                                    adj_date = True
-                                    log_data = log_data.split("\n")
-                                    date_new = subprocess.Popen(
-                                        ["echo $(date)"],
-                                        stdout=subprocess.PIPE,
-                                        stderr=subprocess.PIPE,
-                                        shell=True,
-                                    )
-                                    out, err = date_new.communicate()
-                                    log_to_write = "\n".join(log_data[:-1])
-                                    date_write = str(
-                                        f"{log_to_write}\nJob\nDone\t"
-                                        f"{out.decode('UTF-8').strip()}"
-                                    )
+                                assert date_write
+                                handle_log.write(date_write)
                         except OSError as e:
                             raise e
-                        if adj_date:
+                        if send_email:
+                            # Send mail with file in job_id dir with link to
+                            # job already done, note that job_id directory
+                            # will be deleted
                             try:
                                 with open(
-                                    os.path.join(
-                                        current_working_directory,
-                                        RESULTS_DIR,
-                                        res_dir,
-                                        LOG_FILE,
-                                    ),
+                                    os.path.join(old_result_dir, EMAIL_FILE),
                                     mode="w+",
-                                ) as handle_log:
-                                    assert date_write
-                                    handle_log.write(date_write)
+                                ) as handle_email:
+                                    handle_email.write(f"{dest_email}\n")
+                                    handle_email.write(
+                                        f"{''.join(href.split('/')[:-1])}/load?job={job_id}\n"
+                                    )
+                                    handle_email.write(
+                                        "".join(
+                                            [
+                                                datetime.utcnow().strftime(
+                                                    "%m/%d/%Y, %H:%M:%S"
+                                                ),
+                                                "\n",
+                                            ]
+                                        )
+                                    )
                             except OSError as e:
                                 raise e
-                            if send_email:
-                                # Send mail with file in job_id dir with link to
-                                # job already done, note that job_id directory
-                                # will be deleted
-                                try:
-                                    with open(
-                                        os.path.join(
-                                            current_working_directory,
-                                            RESULTS_DIR,
-                                            res_dir,
-                                            EMAIL_FILE,
-                                        ),
-                                        mode="w+",
-                                    ) as handle_email:
-                                        handle_email.write(f"{dest_email}\n")
-                                        handle_email.write(
-                                            f"{''.join(href.split('/')[:-1])}/load?job={job_id}\n"
+                    elif send_email:
+                        # Job is not finished yet. Add current user's email
+                        # to email.txt
+                        if os.path.exists(os.path.join(old_result_dir, EMAIL_FILE)):
+                            try:
+                                with open(
+                                    os.path.join(old_result_dir, EMAIL_FILE),
+                                    mode="a+",
+                                ) as handle_email:
+                                    handle_email.write("--OTHEREMAIL--")
+                                    handle_email.write(f"{dest_email}\n")
+                                    handle_email.write(
+                                        f"{''.join(href.split('/')[:-1])}/load?job={job_id}\n"
+                                    )
+                                    handle_email.write(
+                                        "".join(
+                                            [
+                                                datetime.utcnow().strftime(
+                                                    "%m/%d/%Y, %H:%M:%S"
+                                                ),
+                                                "\n",
+                                            ]
                                         )
-                                        handle_email.write(
-                                            "".join(
-                                                [
-                                                    datetime.utcnow().strftime(
-                                                        "%m/%d/%Y, %H:%M:%S"
-                                                    ),
-                                                    "\n",
-                                                ]
-                                            )
+                                    )
+                            except OSError as e:
+                                raise e
+                        else:
+                            try:
+                                with open(
+                                    os.path.join(old_result_dir, EMAIL_FILE),
+                                    mode="w+",
+                                ) as handle_email:
+                                    handle_email.write(f"{dest_email}\n")
+                                    handle_email.write(
+                                        f"{''.join(href.split('/')[:-1])}/load?job={job_id}\n"
+                                    )
+                                    handle_email.write(
+                                        "".join(
+                                            [
+                                                datetime.utcnow().strftime(
+                                                    "%m/%d/%Y, %H:%M:%S"
+                                                ),
+                                                "\n",
+                                            ]
                                         )
-                                except OSError as e:
-                                    raise e
-                        elif send_email:
-                            # Job is not finished yet. Add current user's email
-                            # to email.txt
-                            if os.path.exists(
-                                os.path.join(
-                                    current_working_directory,
-                                    RESULTS_DIR,
-                                    res_dir,
-                                    EMAIL_FILE,
-                                )
-                            ):
+                                    )
+                            except OSError as e:
+                                raise e
+                    current_job_dir = result_dir
+                    shutil.rmtree(current_job_dir)
+                    return "/load", f"?job={res_dir}"
+                else:
+                    # log file not found
+                    # we may have entered a job directory that was in queue
+                    if os.path.exists(os.path.join(old_result_dir, QUEUE_FILE)):
+                        if send_email:
+                            if os.path.exists(os.path.join(old_result_dir, EMAIL_FILE)):
                                 try:
                                     with open(
-                                        os.path.join(
-                                            current_working_directory,
-                                            RESULTS_DIR,
-                                            res_dir,
-                                            EMAIL_FILE,
-                                        ),
+                                        os.path.join(old_result_dir, EMAIL_FILE),
                                         mode="a+",
                                     ) as handle_email:
                                         handle_email.write("--OTHEREMAIL--")
@@ -836,12 +924,7 @@ def change_url(
                             else:
                                 try:
                                     with open(
-                                        os.path.join(
-                                            current_working_directory,
-                                            RESULTS_DIR,
-                                            res_dir,
-                                            EMAIL_FILE,
-                                        ),
+                                        os.path.join(old_result_dir, EMAIL_FILE),
                                         mode="w+",
                                     ) as handle_email:
                                         handle_email.write(f"{dest_email}\n")
@@ -860,89 +943,7 @@ def change_url(
                                         )
                                 except OSError as e:
                                     raise e
-                        current_job_dir = os.path.join(
-                            current_working_directory, RESULTS_DIR, job_id
-                        )
-                        cmd = f"rm -r {current_job_dir}"
-                        code = subprocess.call(cmd, shell=True)
-                        if code != 0:
-                            raise ValueError(f"An error occurred while running {cmd}")
-                        return "/load", f"?job={res_dir}"
-                    else:
-                        # log file not found
-                        # we may have entered a job directory that was in queue
-                        if os.path.exists(
-                            os.path.join(
-                                current_working_directory,
-                                RESULTS_DIR,
-                                res_dir,
-                                QUEUE_FILE,
-                            )
-                        ):
-                            if send_email:
-                                if os.path.exists(
-                                    os.path.join(
-                                        current_working_directory,
-                                        RESULTS_DIR,
-                                        res_dir,
-                                        EMAIL_FILE,
-                                    )
-                                ):
-                                    try:
-                                        with open(
-                                            os.path.join(
-                                                current_working_directory,
-                                                RESULTS_DIR,
-                                                res_dir,
-                                                EMAIL_FILE,
-                                            ),
-                                            mode="a+",
-                                        ) as handle_email:
-                                            handle_email.write("--OTHEREMAIL--")
-                                            handle_email.write(f"{dest_email}\n")
-                                            handle_email.write(
-                                                f"{''.join(href.split('/')[:-1])}/load?job={job_id}\n"
-                                            )
-                                            handle_email.write(
-                                                "".join(
-                                                    [
-                                                        datetime.utcnow().strftime(
-                                                            "%m/%d/%Y, %H:%M:%S"
-                                                        ),
-                                                        "\n",
-                                                    ]
-                                                )
-                                            )
-                                    except OSError as e:
-                                        raise e
-                                else:
-                                    try:
-                                        with open(
-                                            os.path.join(
-                                                current_working_directory,
-                                                RESULTS_DIR,
-                                                res_dir,
-                                                EMAIL_FILE,
-                                            ),
-                                            mode="w+",
-                                        ) as handle_email:
-                                            handle_email.write(f"{dest_email}\n")
-                                            handle_email.write(
-                                                f"{''.join(href.split('/')[:-1])}/load?job={job_id}\n"
-                                            )
-                                            handle_email.write(
-                                                "".join(
-                                                    [
-                                                        datetime.utcnow().strftime(
-                                                            "%m/%d/%Y, %H:%M:%S"
-                                                        ),
-                                                        "\n",
-                                                    ]
-                                                )
-                                            )
-                                    except OSError as e:
-                                        raise e
-                            return ("/load", f"?job={res_dir}")
+                        return ("/load", f"?job={res_dir}")
     # merge default is 3 nt wide
     merge_default = 3
     print(
@@ -4,6 +4,8 @@ website.
 
 from app import URL
 
+from functools import lru_cache
+
 import dash_bootstrap_components as dbc
 import dash_html_components as html
 
@@ -111,8 +113,10 @@ def create_search_bar() -> dbc.Row:
     return search_bar
 
 
+@lru_cache(maxsize=1)
 def navbar():
     """Create the navigation bar of CRISPRme website.
+    The navigation bar is built once, later calls return the same layout.
 
     ...
 
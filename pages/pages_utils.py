@@ -11,6 +11,7 @@ import dash_html_components as html
 import pandas as pd
 
 import base64
+import re
 import os
 
 
@@ -212,6 +213,8 @@ PARAMS_FILE = ".Params.txt"
 LOG_FILE = "log.txt"
 # CRISPR guides file
 GUIDES_FILE = ".guides.txt"
+# job fingerprint file (hash of run parameters and guides)
+FINGERPRINT_FILE = ".job_fingerprint"
 # samples files (LIST OF samplesID files, comprehensive samplesID file)
 SAMPLES_FILE_LIST = ".samplesID.txt"
 SAMPLES_ID_FILE = ".sampleID.txt"
@@ -309,12 +312,16 @@ def drop_columns(table: pd.DataFrame, filter_criterion: str) -> List[str]:
         Columns to drop
     """
 
-    if not isinstance(table, pd.DataFrame):
-        raise TypeError(f"Expected {pd.DataFrame.__name__}, got {type(table).__name__}")
-    if not isinstance(filter_criterion, str):
-        raise TypeError(
-            f"Expected {str.__name__}, got {type(filter_criterion).__name__}"
-        )
+    # called on every table query, type checks are stripped under python -O
+    if __debug__:
+        if not isinstance(table, pd.DataFrame):
+            raise TypeError(
+                f"Expected {pd.DataFrame.__name__}, got {type(table).__name__}"
+            )
+        if not isinstance(filter_criterion, str):
+            raise TypeError(
+                f"Expected {str.__name__}, got {type(filter_criterion).__name__}"
+            )
     if filter_criterion not in FILTERING_CRITERIA:
         raise ValueError(f"Forbidden filtering criterion ({filter_criterion})")
     drops = []
@@ -457,6 +464,25 @@ def get_query_column(filter_criterion: str) -> Dict[str, str]:
     return query_columns
 
 
+# filtering operators, matched with one regex scan (longest first, so ">=" is
+# not read as ">"), and their canonical names
+OPERATORS_REGEX = re.compile(
+    "|".join(
+        re.escape(operator)
+        for operator in sorted(
+            {operator for operator_type in operators for operator in operator_type},
+            key=len,
+            reverse=True,
+        )
+    )
+)
+OPERATORS_NAMES = {
+    operator: operator_type[0].strip()
+    for operator_type in operators
+    for operator in operator_type
+}
+
+
 def split_filter_part(filter_part: str) -> Tuple[str, str, str]:
     """Split the data table filter in its parts.
 
@@ -475,24 +501,24 @@ def split_filter_part(filter_part: str) -> Tuple[str, str, str]:
 
     if not isinstance(filter_part, str):
         raise TypeError(f"Expected {str.__name__}, got {type(filter_part).__name__}")
-    for operator_type in operators:
-        for operator in operator_type:
-            if operator in filter_part:
-                name_part, value_part = filter_part.split(operator, 1)
-                name = name_part[(name_part.find("{") + 1) : name_part.rfind("}")]
-                value_part = value_part.strip()
-                v0 = value_part[0]
-                if v0 == value_part[-1] and v0 in ("'", '"', "`"):
-                    value = value_part[1:-1].replace(("\\" + v0), v0)
-                else:
-                    try:
-                        value = float(value_part)
-                    except ValueError:
-                        value = value_part
-                # word operators need spaces after them in the filter string,
-                # but we don't want these later
-                return name, operator_type[0].strip(), value
-    return [None] * 3
+    operator_match = OPERATORS_REGEX.search(filter_part)
+    if operator_match is None:
+        return [None] * 3
+    name_part = filter_part[: operator_match.start()]
+    value_part = filter_part[operator_match.end() :]
+    name = name_part[(name_part.find("{") + 1) : name_part.rfind("}")]
+    value_part = value_part.strip()
+    v0 = value_part[0]
+    if v0 == value_part[-1] and v0 in ("'", '"', "`"):
+        value = value_part[1:-1].replace(("\\" + v0), v0)
+    else:
+        try:
+            value = float(value_part)
+        except ValueError:
+            value = value_part
+    # word operators need spaces after them in the filter string,
+    # but we don't want these later
+    return name, OPERATORS_NAMES[operator_match.group()], value
 
 
 def generate_table(
@@ -974,8 +1000,9 @@ def select_same_len_guides(guides: str) -> str:
 
     if not isinstance(guides, str):
         raise TypeError(f"Expected {str.__name__}, got {type(guides).__name__}")
-    length = len(guides.split("\n")[0])
-    same_len_guides = [guide for guide in guides.split("\n") if len(guide) == length]
+    guides = guides.split("\n")
+    length = len(guides[0])
+    same_len_guides = [guide for guide in guides if len(guide) == length]
     same_len_guides = "\n".join(same_len_guides).strip()
     return same_len_guides
 
@@ -68,7 +68,7 @@ from PostProcess.supportFunctions.loadSample import associateSample
 from PostProcess import CFDGraph, query_manager
 
 from dash.exceptions import PreventUpdate
-from dash.dependencies import Input, Output, State
+from dash.dependencies import Input, Output, State, ClientsideFunction
 from typing import Dict, List, Tuple
 from glob import glob
 
@@ -1226,14 +1226,11 @@ def update_table_cluster(
         (page_current * page_size) : ((page_current + 1) * page_size)
     ].to_dict("records")
     if genome_type != "ref":
-        (
-            dict_sample_to_pop,
-            dict_pop_to_superpop,
-        ) = associateSample.loadSampleAssociation(
+        samples_association = associateSample.sampleAssociation(
             os.path.join(job_directory, SAMPLES_ID_FILE)
-        )[
-            :2
-        ]
+        )
+        dict_sample_to_pop = samples_association.sample_to_pop
+        dict_pop_to_superpop = samples_association.pop_to_superpop
         for row in data_to_send:
             summarized_sample_cell = {}
             for s in row["Samples"].split(","):
@@ -3443,9 +3440,9 @@ def filter_sample_table(
     # get job identifier
     job_id = search.split("=")[-1]
     job_directory = os.path.join(current_working_directory, RESULTS_DIR, job_id)
-    population_1000gp = associateSample.loadSampleAssociation(
+    population_1000gp = associateSample.sampleAssociation(
         os.path.join(job_directory, SAMPLES_ID_FILE)
-    )[2]
+    ).superpop_to_pop
     # read CRISPRme run parameters
     try:
         with open(
@@ -3693,9 +3690,9 @@ def update_sample_drop(pop: str, search: str) -> Tuple[List, None]:
         return [], None  # no update required
     job_id = search.split("=")[-1]
     job_directory = os.path.join(current_working_directory, RESULTS_DIR, job_id)
-    pop_dict = associateSample.loadSampleAssociation(
+    pop_dict = associateSample.sampleAssociation(
         os.path.join(job_directory, SAMPLES_ID_FILE)
-    )[3]
+    ).pop_to_sample
     return [{"label": sample, "value": sample} for sample in pop_dict[pop]], None
 
 
@@ -3734,9 +3731,9 @@ def update_population_drop(superpop: str, search: str) -> Tuple[Dict, None]:
         raise PreventUpdate  # no update required
     job_id = search.split("=")[-1]
     job_directory = os.path.join(current_working_directory, RESULTS_DIR, job_id)
-    population_1000gp = associateSample.loadSampleAssociation(
+    population_1000gp = associateSample.sampleAssociation(
         os.path.join(job_directory, SAMPLES_ID_FILE)
-    )[2]
+    ).superpop_to_pop
     return [{"label": i, "value": i} for i in population_1000gp[superpop]], None
 
 
@@ -4627,9 +4624,9 @@ def update_content_tab(
         more_info_col = ["Show Targets" for _ in range(samples_summary.shape[0])]
         samples_summary[""] = more_info_col
 
-        population_1000gp = associateSample.loadSampleAssociation(
+        population_1000gp = associateSample.sampleAssociation(
             os.path.join(job_directory, SAMPLES_ID_FILE)
-        )[2]
+        ).superpop_to_pop
         super_populations = [{"label": i, "value": i} for i in population_1000gp.keys()]
         populations = []
         for pop in population_1000gp.keys():
@@ -5251,9 +5248,9 @@ def update_content_tab(
             {"label": str(i), "value": str(i)} for i in range(int(max_bulges) + 1)
         ]
         if genome_type != "ref":
-            population_1000gp = associateSample.loadSampleAssociation(
+            population_1000gp = associateSample.sampleAssociation(
                 os.path.join(job_directory, SAMPLES_ID_FILE)
-            )[2]
+            ).superpop_to_pop
             super_populations = [
                 {"label": i, "value": i} for i in population_1000gp.keys()
             ]
@@ -5407,11 +5404,43 @@ def update_content_tab(
         cfd_path = os.path.join(job_directory, f"{job_id}.CFDGraph.txt")
         if not os.path.isfile(cfd_path):  # No file found to display CFD graph
             return fl
-        fl.extend(CFDGraph.CFDGraph(cfd_path))
+        fl.extend(global_store_cfd_graph(cfd_path, os.path.getmtime(cfd_path)))
         return fl
     raise PreventUpdate
 
 
+@cache.memoize(timeout=3600)
+def global_store_cfd_graph(cfd_path: str, mtime: float) -> List:
+    """Cache the CFD distribution graph components of a job.
+
+    ...
+
+    Parameters
+    ----------
+    cfd_path : str
+        Path to CFD graph data
+    mtime : float
+        Modification time of the CFD graph data, part of the cache key so
+        that updated files are reloaded
+
+    Returns
+    -------
+    List
+        CFD graph page components
+    """
+
+    return CFDGraph.CFDGraph(cfd_path)
+
+
+# show the number of targets for the hovered CFD value, computed in the browser
+# from the distribution attached to the graph (see assets/crisprme.js)
+app.clientside_callback(
+    ClientsideFunction(namespace="crisprme", function_name="filter_cfd"),
+    Output("selected-data", "children"),
+    [Input("CFD-graph-id", "hoverData")],
+)
+
+
 # TODO: move auxiliary functions close to each other in this file
 # Perform expensive loading of a dataframe and save result into 'global store'
 # Cache are in the Cache directory
@@ -5691,18 +5720,22 @@ def update_output(
     Tuple
     """
 
-    if not isinstance(n_clicks, int):
-        raise TypeError(f"Expected {int.__name__}, got {type(n_clicks).__name__}")
-    if not isinstance(page_current, int):
-        raise TypeError(f"Expected {int.__name__}, got {type(page_current).__name__}")
-    if not isinstance(filter_target_value, str):
-        raise TypeError(
-            f"Expected {str.__name__}, got {type(filter_target_value).__name__}"
-        )
-    if not isinstance(page_size, int):
-        raise TypeError(f"Expected {int.__name__}, got {type(page_size).__name__}")
-    if not isinstance(target, str):
-        raise TypeError(f"Expected {str.__name__}, got {type(target).__name__}")
+    # runs on every table query, type checks are stripped under python -O
+    if __debug__:
+        if not isinstance(n_clicks, int):
+            raise TypeError(f"Expected {int.__name__}, got {type(n_clicks).__name__}")
+        if not isinstance(page_current, int):
+            raise TypeError(
+                f"Expected {int.__name__}, got {type(page_current).__name__}"
+            )
+        if not isinstance(filter_target_value, str):
+            raise TypeError(
+                f"Expected {str.__name__}, got {type(filter_target_value).__name__}"
+            )
+        if not isinstance(page_size, int):
+            raise TypeError(f"Expected {int.__name__}, got {type(page_size).__name__}")
+        if not isinstance(target, str):
+            raise TypeError(f"Expected {str.__name__}, got {type(target).__name__}")
     # prevent update on None inputs
     if radio_order is None or (
         order_drop is None and thresh_drop is None and asc1 is None
@@ -0,0 +1,103 @@
+"""Regression checks for post-processing scripts run on results files.
+
+Reference-only or variant-free searches produce alternative targets files with
+the header line only; the scripts must write the header and exit cleanly.
+Scores must match those of the former line by line implementations.
+
+Run with: python -m unittest discover -s test
+"""
+
+import subprocess
+import tempfile
+import random
+import unittest
+import sys
+import os
+
+POSTPROCESS_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "PostProcess"
+)
+HEADER = "#Bulge_type\tcrRNA\tDNA\tReference\tChromosome\tPosition\n"
+
+
+def run_script(script, *args):
+    return subprocess.run(
+        [sys.executable, os.path.join(POSTPROCESS_DIR, script), *args],
+        capture_output=True,
+        text=True,
+    )
+
+
+class TestHeaderOnlyResults(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.results = os.path.join(self.tmpdir.name, "results.txt")
+        with open(self.results, mode="w") as handle:
+            handle.write(HEADER)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_annotate_final_results(self):
+        annotation = os.path.join(self.tmpdir.name, "annotation.bed")
+        with open(annotation, mode="w") as handle:
+            handle.write("chr1\t0\t100\tgene\n")
+        annotated = os.path.join(self.tmpdir.name, "annotated.txt")
+        process = run_script(
+            "annotate_final_results.py", self.results, annotation, annotated
+        )
+        self.assertEqual(process.returncode, 0, process.stderr)
+        with open(annotated) as handle:
+            self.assertEqual(handle.read(), HEADER)
+
+    def test_add_risk_score(self):
+        scored = os.path.join(self.tmpdir.name, "scored.txt")
+        for alt, columns in (
+            ("False", ["Highest_CFD_Risk_Score", "Highest_CFD_Absolute_Risk_Score"]),
+            (
+                "True",
+                [
+                    "Highest_CFD_Risk_Score",
+                    "Highest_CFD_Absolute_Risk_Score",
+                    "CLUSTER_ID",
+                ],
+            ),
+        ):
+            process = run_script("add_risk_score.py", self.results, scored, alt)
+            self.assertEqual(process.returncode, 0, process.stderr)
+            with open(scored) as handle:
+                self.assertEqual(
+                    handle.read(), "\t".join([HEADER.strip()] + columns) + "\n"
+                )
+
+
+class TestAddRiskScore(unittest.TestCase):
+    def test_matches_line_by_line_scores(self):
+        random.seed(0)
+        rows = [
+            [f"field{column}" for column in range(20)]
+            + [repr(random.random() * scale), repr(random.random()), "cluster"]
+            for scale in (1, 1e-5, 100)
+            for _ in range(1000)
+        ]
+        rows.append(["field"] * 20 + ["0.5", "0.5", "cluster"])
+        with tempfile.TemporaryDirectory() as tmpdir:
+            targets = os.path.join(tmpdir, "targets.txt")
+            with open(targets, mode="w") as handle:
+                handle.write(HEADER)
+                handle.writelines("\t".join(row) + "\n" for row in rows)
+            scored = os.path.join(tmpdir, "scored.txt")
+            process = run_script("add_risk_score.py", targets, scored, "True")
+            self.assertEqual(process.returncode, 0, process.stderr)
+            with open(scored) as handle:
+                lines = handle.read().split("\n")[1:-1]
+        # risk scores as computed by the former line by line implementation
+        expected = list()
+        for row in rows:
+            cfd_diff = float(row[20]) - float(row[21])
+            expected.append("\t".join(row + [str(cfd_diff), str(abs(cfd_diff))]))
+        self.assertEqual(lines, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()